@@ -1,90 +1,158 @@
 #!/usr/bin/env python3
 import os
 import sys
+import argparse
+import sysconfig
 import subprocess
 import platform
 import shutil
+import time
 from pathlib import Path
 
 
-def find_rkdeveloptool():
-    """Find rkdeveloptool absolute path on the system"""
+# Nuitka's --lto mode. "auto" lets Nuitka decide; set RKGUI_LTO=yes/no to force it.
+LTO_MODES = ("auto", "yes", "no")
+
+
+def _lto_mode():
+    """Return the requested LTO mode from RKGUI_LTO (default: auto)"""
+    mode = os.environ.get("RKGUI_LTO", "auto").strip().lower()
+    if mode not in LTO_MODES:
+        print(f"Ignoring invalid RKGUI_LTO={mode!r} (expected one of {', '.join(LTO_MODES)})")
+        mode = "auto"
+    return mode
+
+
+# Error output of a failing link / LTO step (GNU ld, gold, lld, MSVC link.exe)
+_LINK_FAILURE_MARKERS = (
+    "collect2: error", "ld returned", "lto-wrapper", "lto1:", "ld.lld: error",
+    "ld.gold: error", "undefined reference to", "fatal error lnk", "error lnk",
+    "linker command failed", "link.exe",
+)
+
+
+def _is_link_failure(stderr):
+    """Heuristically detect a failure in the C link / LTO stage"""
+    text = (stderr or "").lower()
+    return any(marker in text for marker in _LINK_FAILURE_MARKERS)
+
+
+def _build_env():
+    """Environment for the Nuitka run with persistent compiler caches.
+
+    Nuitka picks up ccache automatically when it is on PATH (and downloads it
+    itself on Windows); pinning the cache directories keeps them warm across
+    builds, including the throw-away build dirs removed by --remove-output.
+    """
+    env = os.environ.copy()
+    cache_root = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    env.setdefault("NUITKA_CACHE_DIR", str(cache_root / "nuitka"))
+    env.setdefault("CCACHE_DIR", str(cache_root / "ccache"))
+    if platform.system() != "Windows" and not shutil.which("ccache"):
+        print("Hint: install ccache to speed up repeated builds")
+    return env
+
+
+def _available_memory_bytes():
+    """Best-effort available RAM in bytes (psutil if installed), or None"""
     try:
-        result = subprocess.run(["which", "rkdeveloptool"],
-                                capture_output=True, text=True, check=True)
-        tool_path = result.stdout.strip()
-        if tool_path and os.path.exists(tool_path):
-            return tool_path
-    except (subprocess.CalledProcessError, FileNotFoundError):
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    # Linux: MemAvailable counts reclaimable page cache, unlike free pages.
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
         pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
 
-    # Common installation paths
-    common_paths = [
-        "/usr/local/bin/rkdeveloptool",
-        "/usr/bin/rkdeveloptool",
-        "/opt/homebrew/bin/rkdeveloptool",
-        os.path.expanduser("~/.local/bin/rkdeveloptool"),
-    ]
 
-    for path in common_paths:
-        if os.path.exists(path):
-            return path
+def _build_jobs(available_memory):
+    """Parallel C compile jobs: CPUs usable by this process, ~1 GB RAM per job.
 
-    return None
+    os.cpu_count() ignores CPU affinity / container limits, and each C
+    compiler process (especially with LTO) needs around a gigabyte, so
+    oversubscribing either just makes Nuitka's compile stage slower.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        jobs = len(os.sched_getaffinity(0))
+    else:
+        jobs = os.cpu_count() or 4
+    if available_memory is not None:
+        jobs = min(jobs, max(1, available_memory // (1024 ** 3)))
+    return jobs
 
 
-def patch_source_with_tool_path(tool_path):
-    """Patch utils.py with absolute tool path for macOS .app"""
-    if not tool_path:
-        return False
+TOOL_PATH_CACHE = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") \
+    / "rkdeveloptool-gui" / "tool-path"
+
 
-    source_file = os.path.join("rkdeveloptool-gui", "utils.py")
-    backup_file = os.path.join("rkdeveloptool-gui", "utils.py.backup")
+def find_rkdeveloptool():
+    """Find rkdeveloptool absolute path on the system
 
-    # Create backup
-    shutil.copy2(source_file, backup_file)
+    RKDEVELOPTOOL_BIN (the same override the app honours at runtime) wins;
+    otherwise the last resolved path is reused from TOOL_PATH_CACHE as long
+    as it still exists, before searching PATH and common install locations.
+    """
+    override = os.environ.get("RKDEVELOPTOOL_BIN")
+    if override and os.path.exists(override):
+        return override
 
     try:
-        with open(source_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        cached = TOOL_PATH_CACHE.read_text(encoding="utf-8").strip()
+        if cached and os.path.exists(cached):
+            return cached
+    except OSError:
+        pass
 
-        # Replace RKTOOL = "rkdeveloptool" with absolute path
-        old_line = 'RKTOOL = "rkdeveloptool"'
-        new_line = f'RKTOOL = "{tool_path}"'
+    tool_path = shutil.which("rkdeveloptool")
 
-        if old_line in content:
-            content = content.replace(old_line, new_line)
+    if not tool_path:
+        # Common installation paths
+        common_paths = [
+            "/usr/local/bin/rkdeveloptool",
+            "/usr/bin/rkdeveloptool",
+            "/opt/homebrew/bin/rkdeveloptool",
+            os.path.expanduser("~/.local/bin/rkdeveloptool"),
+        ]
+        tool_path = next((p for p in common_paths if os.path.exists(p)), None)
 
-            with open(source_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+    if tool_path:
+        try:
+            TOOL_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            TOOL_PATH_CACHE.write_text(tool_path, encoding="utf-8")
+        except OSError:
+            pass
 
-            print(f"Patched {source_file} with tool path: {tool_path}")
-            return True
-        else:
-            print(f"Could not find line to patch in {source_file}")
-            return False
-
-    except Exception as e:
-        print(f"Failed to patch source: {e}")
-        # Restore backup
-        if os.path.exists(backup_file):
-            shutil.copy2(backup_file, source_file)
-        return False
+    return tool_path
 
 
-def restore_source():
-    """Restore original source file"""
-    backup_file = os.path.join("rkdeveloptool-gui", "utils.py.backup")
-    source_file = os.path.join("rkdeveloptool-gui", "utils.py")
+def _static_libpython_available():
+    """True if this interpreter can be linked against a static libpython.
 
-    if os.path.exists(backup_file):
-        shutil.copy2(backup_file, source_file)
-        os.remove(backup_file)
-        print("Restored original source file")
+    --static-libpython=yes needs a CPython built without --enable-shared (or
+    one that ships libpython.a anyway, as uv/pyenv builds often do).
+    """
+    libdir = sysconfig.get_config_var("LIBPL") or sysconfig.get_config_var("LIBDIR")
+    library = sysconfig.get_config_var("LIBRARY")
+    return bool(libdir and library and os.path.exists(os.path.join(libdir, library)))
 
 
-def build_with_nuitka():
-    """Build project using Nuitka"""
+def build_with_nuitka(dev=False):
+    """Build project using Nuitka
+
+    dev: faster-to-build, faster-to-start developer build - a standalone
+         folder instead of a onefile binary, no LTO, static libpython when
+         the interpreter provides one, and the build directory kept so the
+         next run can reuse it.
+    """
     # Check if Nuitka is installed
     try:
         subprocess.run([sys.executable, "-m", "nuitka", "--version"],
@@ -119,25 +187,44 @@ def build_with_nuitka():
         )
 
     system = platform.system().lower()
-    patched = False
     # Note: the app locates rkdeveloptool at runtime (see utils._find_rkdeveloptool),
     # preferring a copy bundled next to the executable, so no source patching is
     # needed here. Drop the bundled binary into the build output to ship it.
 
+    if dev:
+        lto, lto_forced = "no", True
+    else:
+        lto = _lto_mode()
+        # Only an explicit yes/no pins LTO; auto (or an invalid value that
+        # fell back to it) keeps the --lto=no retry.
+        lto_forced = lto != "auto"
+    available_memory = _available_memory_bytes()
+
     try:
         # Base compilation command
         cmd = [
             sys.executable, "-m", "nuitka",
             "--follow-imports",
             "--enable-plugin=pyside6",
-            "--remove-output",
             "--assume-yes-for-downloads",
             "--output-dir=dist",
-            "--lto=yes",
-            f"--jobs={os.cpu_count() or 4}",
+            f"--lto={lto}",
+            f"--jobs={_build_jobs(available_memory)}",
             "--quiet",
         ]
 
+        if not dev:
+            cmd.append("--remove-output")
+        elif _static_libpython_available():
+            cmd.append("--static-libpython=yes")
+        else:
+            print("No static libpython for this interpreter, linking it dynamically")
+
+        # Trade some compile speed for a much smaller peak footprint on
+        # machines that would otherwise start swapping.
+        if available_memory is not None and available_memory < 8 * 1024 ** 3:
+            cmd.append("--low-memory")
+
         # Platform-specific options
         if system == "darwin":  # macOS - .app bundle
             cmd.extend([
@@ -146,6 +233,8 @@ def build_with_nuitka():
                 "--macos-app-name=RKDevelopTool-GUI",
                 "--macos-app-icon=none",
             ])
+        elif system == "linux" and dev:  # Linux dev build - folder, no unpacking
+            cmd.append("--standalone")
         elif system == "linux":  # Linux - single file
             cmd.extend([
                 "--onefile",
@@ -163,20 +252,38 @@ def build_with_nuitka():
         # Execute compilation
         print(f"Building RKDevelopTool-GUI ({platform.system()})...")
 
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=1800)
-        print("Build successful!")
-
-        # Show generated file info
-        output_dir = Path("dist")
-        if output_dir.exists():
-            for item in output_dir.iterdir():
-                if item.is_dir() and item.suffix == ".app":
-                    print(f"Output: {item.name} (macOS App Bundle)")
-                    print(f"Location: dist/{item.name}")
-                elif item.is_file() and item.name in ("rkdevtoolgui", "rkdevtoolgui.bin"):
-                    size = item.stat().st_size / (1024 * 1024)  # MB
-                    print(f"Output: {item.name} ({size:.2f} MB)")
-                    print(f"Location: dist/{item.name}")
+        env = _build_env()
+        started = time.monotonic()
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=1800, env=env)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            # LTO can blow the link stage up to hours or fail outright on some
+            # toolchains while buying little for a small app; unless the user
+            # asked for it explicitly, retry once without it.
+            link_problem = isinstance(e, subprocess.TimeoutExpired) or _is_link_failure(e.stderr)
+            if lto_forced or lto == "no" or not link_problem:
+                raise
+            print(f"LTO build failed after {time.monotonic() - started:.0f}s, retrying with --lto=no...")
+            cmd[cmd.index(f"--lto={lto}")] = "--lto=no"
+            started = time.monotonic()
+            subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=1800, env=env)
+        print(f"Build successful! ({time.monotonic() - started:.0f}s)")
+
+        # Show generated file info (DirEntry caches the type from readdir,
+        # so only the reported binary needs a stat call)
+        if os.path.isdir("dist"):
+            with os.scandir("dist") as it:
+                for entry in it:
+                    if entry.name.endswith(".app") and entry.is_dir():
+                        print(f"Output: {entry.name} (macOS App Bundle)")
+                        print(f"Location: dist/{entry.name}")
+                    elif entry.name in ("rkdevtoolgui", "rkdevtoolgui.bin") and entry.is_file():
+                        size = entry.stat().st_size / (1024 * 1024)  # MB
+                        print(f"Output: {entry.name} ({size:.2f} MB)")
+                        print(f"Location: dist/{entry.name}")
+                    elif entry.name == "rkdevtoolgui.dist" and entry.is_dir():
+                        print(f"Output: {entry.name} (standalone folder)")
+                        print(f"Location: dist/{entry.name}")
 
         return True
 
@@ -188,12 +295,12 @@ def build_with_nuitka():
     except subprocess.TimeoutExpired:
         print("Build timeout (30 minutes)")
         return False
-    finally:
-        # Always restore original source if patched
-        if patched:
-            restore_source()
 
 
 if __name__ == "__main__":
-    success = build_with_nuitka()
+    parser = argparse.ArgumentParser(description="Build RKDevelopTool-GUI with Nuitka")
+    parser.add_argument("--dev", action="store_true",
+                        help="quick developer build: standalone folder, no LTO, static libpython if available")
+    args = parser.parse_args()
+    success = build_with_nuitka(dev=args.dev)
     sys.exit(0 if success else 1)
\ No newline at end of file
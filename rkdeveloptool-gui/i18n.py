@@ -129,6 +129,7 @@ TRANSLATIONS = {
         "failure": "执行失败: ",
         "abnormal_execution": "执行异常: ",
         "command_already_running": "已有命令在运行，请稍候。",
+        "storage_probe_running": "正在检测存储类型，请稍候。",
         "file_dialog_firmware": "固件文件 (*.img);;所有文件 (*)",
         "file_dialog_loader": "Loader 文件 (*.bin);;所有文件 (*)",
         "file_dialog_image": "镜像文件 (*.img *.bin);;所有文件 (*)",
@@ -226,6 +227,7 @@ TRANSLATIONS = {
         "read_flash_id_btn": "读取 Flash ID",
         "read_flash_info_btn": "读取 Flash 信息",
         "reading_flash_id": "读取 Flash ID 中...",
+        "reading_flash_info": "读取 Flash 信息中...",
         "reading_device_capability": "读取设备能力中...",
         "flash_id_info": "Flash ID 信息",
         "device_capability": "设备能力信息",
@@ -296,6 +298,8 @@ TRANSLATIONS = {
         "file_size": "文件大小",
         "target_address": "目标地址",
         "confirm_proceed": "确认继续此操作吗?",
+        "digest_computing": "校验值: 计算中…",
+        "quick_fingerprint": "快速指纹 (首尾 64 KiB)",
         "confirm_burn_simple": "确认烧录此文件吗?",
         "mass_device_scan": "扫描批量设备",
         "found_devices": "找到设备",
@@ -505,6 +509,7 @@ TRANSLATIONS = {
         "failure": "Execution failed: ",
         "abnormal_execution": "Execution abnormal: ",
         "command_already_running": "A command is already running. Please wait.",
+        "storage_probe_running": "Detecting storage types. Please wait.",
         "file_dialog_firmware": "Firmware File (*.img);;All Files (*)",
         "file_dialog_loader": "Loader File (*.bin);;All Files (*)",
         "file_dialog_image": "Image File (*.img *.bin);;All Files (*)",
@@ -621,6 +626,7 @@ TRANSLATIONS = {
         "read_flash_id_btn": "Read Flash ID",
         "read_flash_info_btn": "Read Flash Info",
         "reading_flash_id": "Reading Flash ID...",
+        "reading_flash_info": "Reading Flash information...",
         "reading_device_capability": "Reading device capability...",
         "flash_id_info": "Flash ID Information",
         "device_capability": "Device Capability Information",
@@ -688,6 +694,8 @@ TRANSLATIONS = {
         "file_size": "File Size",
         "target_address": "Target Address",
         "confirm_proceed": "Are you sure you want to proceed with this operation?",
+        "digest_computing": "Checksum: computing…",
+        "quick_fingerprint": "Quick fingerprint (first/last 64 KiB)",
         "confirm_burn_simple": "Confirm burning this file?",
         "mass_device_scan": "Scan Mass Devices",
         "found_devices": "Found devices",
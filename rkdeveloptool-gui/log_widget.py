@@ -2,14 +2,17 @@
 Real-time log widget with live streaming display
 Provides color-coded log levels, timestamps, and auto-scrolling
 """
+from collections import deque
 from datetime import datetime
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QTextEdit, QHBoxLayout, QPushButton, QLabel, QProgressBar
 )
-from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QTextCursor, QFont, QColor, QTextCharFormat
 import re
 
+_PROGRESS_RE = re.compile(r'(\d+)%')
+
 
 class RealtimeLogWidget(QWidget):
     """Enhanced real-time log display widget with colors and timestamps"""
@@ -28,8 +31,17 @@ class RealtimeLogWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.init_ui()
-        self.log_buffer = []
         self.max_lines = 1000  # Limit to 1000 lines for performance
+        self.log_buffer = deque(maxlen=self.max_lines)
+        # One char format per level, shared by every line of that level
+        font = QFont("Courier", 9)
+        self._formats = {}
+        for level, color in self.LOG_COLORS.items():
+            fmt = QTextCharFormat()
+            fmt.setForeground(color)
+            fmt.setFont(font)
+            self._formats[level] = fmt
+        self._scroll_pending = False
         
     def init_ui(self):
         """Initialize the UI"""
@@ -93,15 +105,27 @@ class RealtimeLogWidget(QWidget):
         if progress is not None:
             self.set_progress(progress)
         
-        # Store in buffer
+        # Store in buffer (the deque drops the oldest line past max_lines)
         self.log_buffer.append((formatted_msg, level))
         
-        # Limit buffer size
-        if len(self.log_buffer) > self.max_lines:
-            self.log_buffer.pop(0)
-        
         # Update display
-        self._update_display()
+        self._append_display([(formatted_msg, level)])
+
+    def add_logs(self, messages):
+        """Add a batch of log messages (one timestamp, one display edit)"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        lines = []
+        progress = None
+        for message in messages:
+            line = (f"[{timestamp}] {message}", self._extract_log_level(message))
+            self.log_buffer.append(line)
+            lines.append(line)
+            value = self._extract_progress(message)
+            if value is not None:
+                progress = value
+        if progress is not None:
+            self.set_progress(progress)
+        self._append_display(lines)
     
     def _extract_log_level(self, message):
         """Extract log level from message"""
@@ -120,7 +144,9 @@ class RealtimeLogWidget(QWidget):
     
     def _extract_progress(self, message):
         """Extract progress percentage from message"""
-        match = re.search(r'(\d+)%', message)
+        if '%' not in message:
+            return None
+        match = _PROGRESS_RE.search(message)
         if match:
             try:
                 return int(match.group(1))
@@ -128,31 +154,45 @@ class RealtimeLogWidget(QWidget):
                 return None
         return None
     
-    def _update_display(self):
-        """Update the log display with colored text"""
-        cursor = self.log_display.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self.log_display.setTextCursor(cursor)
-        
-        # Clear and rebuild (more efficient for large buffers)
-        self.log_display.clear()
-        
-        for msg, level in self.log_buffer:
-            # Set text color based on level
-            fmt = QTextCharFormat()
-            fmt.setForeground(self.LOG_COLORS.get(level, QColor(170, 170, 170)))
-            fmt.setFont(QFont("Courier", 9))
-            
-            # Add to document
-            cursor.insertText(msg + "\n", fmt)
-        
-        # Auto-scroll to bottom
+    def _append_display(self, lines):
+        """Append colored (msg, level) lines to the log display.
+
+        Only the new lines are inserted (and the oldest ones dropped once the
+        display holds max_lines) in a single edit block, and scrolling to the
+        bottom is coalesced to once per event-loop turn, so a burst of log
+        lines costs one relayout instead of one full rebuild per line.
+        """
+        document = self.log_display.document()
+        cursor = QTextCursor(document)
         cursor.movePosition(QTextCursor.End)
-        self.log_display.setTextCursor(cursor)
+        cursor.beginEditBlock()
+        info = self._formats['INFO']
+        for msg, level in lines:
+            cursor.insertText(msg + "\n", self._formats.get(level, info))
+
+        # The trailing newline leaves an empty last block
+        excess = document.blockCount() - (self.max_lines + 1)
+        if excess > 0:
+            cursor.movePosition(QTextCursor.Start)
+            cursor.movePosition(QTextCursor.NextBlock, QTextCursor.KeepAnchor, excess)
+            cursor.removeSelectedText()
+        cursor.endEditBlock()
+
+        if not self._scroll_pending:
+            self._scroll_pending = True
+            QTimer.singleShot(0, self._flush_scroll)
+
+    def _flush_scroll(self):
+        """Auto-scroll to bottom (queued by _append_display)"""
+        self._scroll_pending = False
+        scrollbar = self.log_display.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
     
     def set_progress(self, value):
         """Set progress bar value (0-100)"""
         value = max(0, min(100, value))
+        if value == self.progress_bar.value():
+            return
         self.progress_bar.setValue(value)
         self.progress_label.setText(f"Progress: {value}%")
     
@@ -4,19 +4,62 @@ Contains all device interaction methods with improved flash capacity detection
 """
 import os
 import re
+import sys
 import shutil
+import platform
 import subprocess
 import tempfile
-import math
+import functools
+from string import Template
+from PySide6.QtCore import QTimer, QSignalBlocker
 from PySide6.QtWidgets import QFileDialog, QMessageBox, QInputDialog, QApplication, QLineEdit
 
 from . import rkfw
 from .utils import (
-    RKTOOL, parse_partition_info, parse_flash_info,
-    calculate_file_md5, format_file_size, safe_slot, is_rkfw_image
+    RKTOOL, parse_partition_info, parse_flash_info, parse_flash_id,
+    parse_capability, format_capability_info, parse_security_info,
+    format_security_info, format_test_results,
+    format_file_size, safe_slot, is_rkfw_image, calculate_file_digest,
+    quick_file_fingerprint, _MB_BYTES, _GB_BYTES
 )
-from .workers import PartitionPPTWorker, CommandWorker
-from .ui_text_updates import populate_address_combo, populate_partition_combo
+from .workers import PartitionPPTWorker, FlashInfoWorker, DigestWorker, StorageProbeWorker
+from .ui_text_updates import (
+    populate_address_combo, populate_partition_combo, ADDRESS_CUSTOM, ADDRESS_FULL_FIRMWARE
+)
+from .widgets import file_dialog_options
+
+# "rkdeveloptool ver 1.32" (see get_rkdeveloptool_version)
+_VERSION_RE = re.compile(r'ver\s+([\d.]+)')
+
+_UNIT_BYTES = {'KB': 1 << 10, 'MB': _MB_BYTES, 'GB': _GB_BYTES, 'TB': 1 << 40}
+
+
+_DECIMAL_CHARS = frozenset('0123456789.')
+
+
+def _size_to_bytes(text):
+    """Convert '512KB', '128 MB', '1.5gb', '1TB' to bytes, or None if text
+    isn't a number followed by one of those units.
+
+    A plain suffix check and float() - these are short, one-off strings, so
+    there is no need to go through the regex engine.
+    """
+    text = text.strip().upper()
+    multiplier = _UNIT_BYTES.get(text[-2:])
+    if multiplier is None:
+        return None
+    number = text[:-2].rstrip()
+    if not number or not _DECIMAL_CHARS.issuperset(number):
+        return None
+    try:
+        return int(float(number) * multiplier)
+    except ValueError:  # e.g. '1.2.3'
+        return None
+
+
+def _bytes_to_sectors(bytes_size):
+    """Number of 512-byte sectors needed to cover bytes_size."""
+    return (bytes_size + 511) >> 9
 
 
 def _is_sector_zero(address):
@@ -27,13 +70,126 @@ def _is_sector_zero(address):
         return False
 
 
+@functools.lru_cache(maxsize=16)
+def _format_capacity(bytes_size):
+    """Return (size_display, sectors, length_arg) for a flash capacity in bytes.
+
+    The capacity only changes with the device, so results are memoized.
+    """
+    sectors = _bytes_to_sectors(bytes_size)
+    if bytes_size >= _GB_BYTES:
+        size_display = f"{bytes_size / _GB_BYTES:.2f} GB"
+    else:
+        size_display = f"{bytes_size / _MB_BYTES:.2f} MB"
+    return size_display, sectors, hex(sectors)
+
+
+def _stat_or_none(path):
+    """os.stat(path), or None if the path is empty or can't be stat'ed."""
+    if not path:
+        return None
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
 def style_messagebox(msg_box):
-    """Apply current application theme to QMessageBox via palette"""
-    msg_box.setPalette(QApplication.palette())
+    """Apply current application theme to QMessageBox via palette.
+
+    A new box already inherits the application palette and ThemeManager
+    repaints every live widget on a theme switch, so this only calls
+    setPalette() (which re-polishes the box and all its children) when the
+    palettes actually differ.
+    """
+    palette = QApplication.palette()
+    if msg_box.palette() != palette:
+        msg_box.setPalette(palette)
+
+
+def _confirm_box(gui, title):
+    """Return the shared Yes/No confirmation box, retitled for this prompt.
+
+    Built once per window (parented to it, so Qt frees it with the window)
+    and reused by the backup and burn confirmations instead of constructing
+    and styling a new QMessageBox for each prompt. ThemeManager.apply_theme()
+    restyles it along with every other widget, so no per-prompt setPalette.
+    """
+    msg = getattr(gui, '_confirm_msgbox', None)
+    if msg is None:
+        msg = QMessageBox(gui)
+        msg.setIcon(QMessageBox.Icon.Question)
+        msg.setStandardButtons(QMessageBox.StandardButton.No | QMessageBox.StandardButton.Yes)
+        msg.setMinimumWidth(550)
+        gui._confirm_msgbox = msg
+    msg.setWindowTitle(title)
+    # Clear focus to prevent button highlighting
+    msg.setFocus()
+    return msg
+
+
+# Confirmation dialog text with the translations filled in, per language
+_CONFIRM_TEMPLATES = {}
+
+
+def _confirm_templates(gui):
+    """Return the burn/backup confirmation Templates for the current language.
+
+    Only the file, size and address fields change between prompts, so the
+    translated skeleton is assembled once per language and substituted into.
+    """
+    lang = gui.manager.lang
+    templates = _CONFIRM_TEMPLATES.get(lang)
+    if templates is None:
+        def t(key):
+            return gui.tr(key).replace('$', '$$')
+        templates = {
+            'burn_head': Template(f"""
+{t("burn_confirmation_message")}
+
+{t("file_name")}: $name
+{t("file_size")}: $size ($size_bytes bytes)
+{t("target_address")}: $address
+"""),
+            'burn_tail': Template(f"""
+
+{t("storage_type")}: $storage ($storage_type)
+
+{t("confirm_proceed")}
+        """),
+            'backup': Template(f"""
+{t("backup_confirmation_message")}
+
+{t("flash_capacity")}: $size
+{t("total_sectors")}: $sectors ($length)
+{t("save_to")}: $name
+
+{t("backup_time_warning")}
+        """),
+        }
+        _CONFIRM_TEMPLATES[lang] = templates
+    return templates
+
+
+def _show_info_box(gui, title, text):
+    """Show text in the shared Information box and wait for it to be closed.
+
+    Like _confirm_box, the box is built once per window and only retitled
+    and refilled for each of the device info dialogs.
+    """
+    msg = getattr(gui, '_info_msgbox', None)
+    if msg is None:
+        msg = QMessageBox(gui)
+        msg.setIcon(QMessageBox.Icon.Information)
+        gui._info_msgbox = msg
+    msg.setWindowTitle(title)
+    msg.setText(text)
+    msg.exec()
 
 
+@functools.lru_cache(maxsize=1)
 def get_rkdeveloptool_version():
-    """Get rkdeveloptool version"""
+    """Get rkdeveloptool version (the binary doesn't change while the app runs)"""
     try:
         env = os.environ.copy()
         env['NO_COLOR'] = '1'
@@ -42,7 +198,7 @@ def get_rkdeveloptool_version():
         result = subprocess.run([RKTOOL, "--version"], capture_output=True, text=True, timeout=2, env=env)
         output = (result.stdout or "") + (result.stderr or "")
         # Parse "rkdeveloptool ver 1.32" format
-        m = re.search(r'ver\s+([\d.]+)', output)
+        m = _VERSION_RE.search(output)
         if m:
             return m.group(1)
     except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError):
@@ -60,106 +216,159 @@ def get_detailed_device_info(gui):
     gui.run_command([RKTOOL, "rcb"], "reading_device_info")
 
 
-def get_flash_capacity_bytes(gui):
+def _flash_info_capacity_bytes(flash_info, origin):
+    """Return (bytes_size, source_description) from parsed `rfi` info, or None.
+
+    An exact sector count wins, then the MB/GB capacity, then a hex size.
+    """
+    if not flash_info:
+        return None
+    sectors = flash_info.get('sectors')
+    if sectors:
+        return sectors * 512, f"{origin} ({sectors} sectors)"
+    capacity_str = flash_info.get('capacity', '')
+    if capacity_str:
+        bytes_size = _size_to_bytes(capacity_str)
+        if bytes_size is not None:
+            return bytes_size, f"{origin} ({capacity_str})"
+    size_hex = flash_info.get('size_hex')
+    if size_hex:
+        return int(size_hex, 16), f"{origin} ({size_hex})"
+    return None
+
+
+def _cached_flash_capacity_bytes(gui):
+    """Return (bytes_size, source_description) from gui._cached_flash_info, or None."""
+    return _flash_info_capacity_bytes(getattr(gui, '_cached_flash_info', None), "cached")
+
+
+def _start_flash_info_query(gui):
+    """Return the running background `rfi` query, starting one if needed.
+
+    The worker is kept on gui._flash_info_worker so it outlives the caller
+    (e.g. a cancelled dialog) and several callers share one device query.
+    Only the capacity is wanted here, so the tool is stopped once it is known.
+    """
+    worker = getattr(gui, '_flash_info_worker', None)
+    if worker is not None and worker.isRunning():
+        return worker
+    worker = FlashInfoWorker(stop_at_capacity=True)
+    gui._flash_info_worker = worker
+    worker.start()
+    return worker
+
+
+def get_flash_capacity_bytes(gui, prefetch=None):
     """
     Get flash capacity in bytes from cached info or by querying device
+    prefetch: optional FlashInfoWorker whose `rfi` output is used; pass a
+    finished one (see request_flash_capacity) so this doesn't wait on it
+    Without it, a background query is started so the capacity is cached for
+    the next call, and (None, "querying_async") is returned.
     Returns: (bytes_size, source_description) or (None, error_message)
     """
     # Try cached flash info first
-    if hasattr(gui, '_cached_flash_info') and gui._cached_flash_info:
-        capacity_str = gui._cached_flash_info.get('capacity', '')
-        if capacity_str:
-            m = re.match(r'([0-9.]+)\s*(MB|GB)', capacity_str, re.I)
-            if m:
-                val = float(m.group(1))
-                unit = m.group(2).upper()
-                bytes_size = int(val * 1024 ** (3 if unit == 'GB' else 2))
-                return bytes_size, f"cached ({capacity_str})"
+    cached = _cached_flash_capacity_bytes(gui)
+    if cached:
+        return cached
+
+    if prefetch is None:
+        _start_flash_info_query(gui)
+        return None, "querying_async"
 
     # Query device for flash info
     try:
-        env = os.environ.copy()
-        env['NO_COLOR'] = '1'
-        env['CLICOLOR'] = '0'
-        env['CLICOLOR_FORCE'] = '0'
-        result = subprocess.run([RKTOOL, "rfi"], capture_output=True, text=True, timeout=6, env=env)
-        out = (result.stdout or "") + "\n" + (result.stderr or "")
+        if not prefetch.wait(7000):
+            return None, "device_timeout"
+        if prefetch.error:
+            return None, prefetch.error
+        out = prefetch.output
+
+        # One parse serves both the capacity and the cache
+        flash_info = parse_flash_info(out)
+        sized = _flash_info_capacity_bytes(flash_info, "detected")
+        if sized:
+            gui._cached_flash_info = flash_info
+            return sized
 
-        # Try to parse capacity
-        m = re.search(r'capacity[:\s]*([0-9.]+)\s*(MB|GB)', out, re.I)
-        if m:
-            val = float(m.group(1))
-            unit = m.group(2).upper()
-            bytes_size = int(val * 1024 ** (3 if unit == 'GB' else 2))
+        return None, "no_capacity_info"
 
-            # Cache the result
-            flash_info = parse_flash_info(out)
-            if flash_info:
-                gui._cached_flash_info = flash_info
+    except Exception as e:
+        return None, f"query_error: {str(e)}"
 
-            return bytes_size, f"detected ({val} {unit})"
 
-        # Try to parse size field
-        m2 = re.search(r'size[:\s]*(0x[0-9A-Fa-f]+)', out, re.I)
-        if m2:
-            bytes_size = int(m2.group(1), 16)
-            return bytes_size, f"detected (0x{m2.group(1)})"
+def _when_finished(query, fn):
+    """Call fn() once the QThread query has finished - now, if it already has.
 
-        return None, "no_capacity_info"
+    The slot is connected before isFinished() is checked, so a worker that
+    finishes in between can't be missed; fn runs only once either way.
+    """
+    pending = [True]
 
-    except subprocess.TimeoutExpired:
-        return None, "device_timeout"
-    except Exception as e:
-        return None, f"query_error: {str(e)}"
+    def run_once():
+        if pending:
+            pending.clear()
+            fn()
+
+    query.finished.connect(safe_slot(run_once))
+    if query.isFinished():
+        run_once()
+
+
+def request_flash_capacity(gui, callback, prefetch=None):
+    """Call callback(bytes_size, source) once the flash capacity is known.
+
+    Answers immediately from the cache; otherwise uses prefetch (a
+    FlashInfoWorker started earlier) or joins/starts the background `rfi`
+    query and calls back from its finished signal, so the GUI thread never
+    waits on the device.
+    """
+    cached = _cached_flash_capacity_bytes(gui)
+    if cached:
+        callback(*cached)
+        return
+    query = prefetch if prefetch is not None else _start_flash_info_query(gui)
+    if not query.isFinished():
+        gui.log_message(gui.tr('reading_flash_info'))
+    _when_finished(query, lambda: callback(*get_flash_capacity_bytes(gui, prefetch=query)))
 
 
 def backup_firmware(gui):
     """Backup entire firmware with automatic capacity detection"""
+    # Query the flash capacity in the background while the save dialog is
+    # open, so the device round-trip overlaps with the user picking a path.
+    prefetch = None
+    if not _cached_flash_capacity_bytes(gui):
+        prefetch = _start_flash_info_query(gui)
+
     save_path, _ = QFileDialog.getSaveFileName(
-        gui, gui.tr("save_file_dialog"), "firmware_backup.bin", gui.tr("file_dialog_all")
+        gui, gui.tr("save_file_dialog"), "firmware_backup.bin", gui.tr("file_dialog_all"),
+        options=file_dialog_options()
     )
     if not save_path:
         return
 
-    # Try to get flash capacity automatically
-    bytes_size, source = get_flash_capacity_bytes(gui)
-
-    if bytes_size and bytes_size > 0:
-        sectors = (bytes_size + 511) // 512
-        length_arg = hex(sectors)
+    # Continue once the capacity is known, without blocking on the query
+    request_flash_capacity(
+        gui, lambda bytes_size, source: _backup_firmware_to(gui, save_path, bytes_size, source), prefetch
+    )
 
-        size_mb = bytes_size / (1024 ** 2)
-        size_gb = bytes_size / (1024 ** 3)
 
-        if size_gb >= 1:
-            size_display = f"{size_gb:.2f} GB"
-        else:
-            size_display = f"{size_mb:.2f} MB"
+def _backup_firmware_to(gui, save_path, bytes_size, source):
+    """Second half of backup_firmware: confirm and read the whole flash"""
+    if bytes_size and bytes_size > 0:
+        size_display, sectors, length_arg = _format_capacity(bytes_size)
 
         gui.log_message(f"[INFO] {gui.tr('detected_flash_size')}: {size_display} ({source})")
         gui.log_message(f"[INFO] {gui.tr('backup_sectors')}: {length_arg} ({sectors:,} sectors)")
 
         # Confirm with user
-        msg = QMessageBox()
-        style_messagebox(msg)
-        msg.setWindowTitle(gui.tr("confirm_backup_title"))
-        msg.setIcon(QMessageBox.Icon.Question)
-
-        detail_text = f"""
-{gui.tr("backup_confirmation_message")}
-
-{gui.tr("flash_capacity")}: {size_display}
-{gui.tr("total_sectors")}: {sectors:,} ({length_arg})
-{gui.tr("save_to")}: {os.path.basename(save_path)}
+        msg = _confirm_box(gui, gui.tr("confirm_backup_title"))
 
-{gui.tr("backup_time_warning")}
-        """
-
-        msg.setText(detail_text)
-        msg.setStandardButtons(QMessageBox.StandardButton.No | QMessageBox.StandardButton.Yes)
-        msg.setMinimumWidth(550)
-        # Clear focus to prevent button highlighting
-        msg.setFocus()
+        msg.setText(_confirm_templates(gui)['backup'].substitute(
+            size=size_display, sectors=f"{sectors:,}", length=length_arg,
+            name=os.path.basename(save_path)
+        ))
 
         if msg.exec() == QMessageBox.StandardButton.Yes:
             gui.run_command([RKTOOL, "rl", "0x0", length_arg, save_path], "backing_up")
@@ -186,20 +395,15 @@ def backup_firmware(gui):
 
 
 def _parse_length_arg(text):
-    """Convert a user-entered length ('128MB', '1.5GB', or a raw sector-count hex
-    string like '0x1E0000') into the sector-count hex string rkdeveloptool expects."""
-    text = text.strip()
-    m = re.match(r'^([0-9.]+)\s*(MB|GB)$', text, re.I)
-    if m:
-        val = float(m.group(1))
-        unit = m.group(2).upper()
-        bytes_size = int(val * 1024 ** (3 if unit == 'GB' else 2))
-        sectors = (bytes_size + 511) // 512
-        return hex(sectors)
-    return text
-
-
-def _partition_length_arg(gui, info):
+    """Convert a user-entered length ('512KB', '128MB', '1.5GB', '1TB', or a raw sector-count
+    hex string like '0x1E0000') into the sector-count hex string rkdeveloptool expects."""
+    bytes_size = _size_to_bytes(text)
+    if bytes_size is not None:
+        return hex(_bytes_to_sectors(bytes_size))
+    return text.strip()
+
+
+def _partition_length_arg(gui, info, prefetch=None):
     """Return the sector-count CLI argument needed to read/write a partition in full.
 
     `info['size']` from parse_partition_info() is already the sector count between this
@@ -219,11 +423,11 @@ def _partition_length_arg(gui, info):
     except (TypeError, ValueError):
         return None
 
-    bytes_size, _ = get_flash_capacity_bytes(gui)
+    bytes_size, _ = get_flash_capacity_bytes(gui, prefetch)
     if not bytes_size:
         return None
 
-    total_sectors = bytes_size // 512
+    total_sectors = bytes_size >> 9
     remaining = total_sectors - start_sectors
     return hex(remaining) if remaining > 0 else None
 
@@ -247,13 +451,39 @@ def reset_device(gui):
     gui.run_command([RKTOOL, "rd"], "rebooting")
 
 
+# Calls to read_partition_table within this window collapse into one `ppt`
+_PARTITION_DEBOUNCE_MS = 150
+
+
 def read_partition_table(gui):
-    """Read partition table in background"""
+    """Read partition table in background.
+
+    Debounced: bursts of requests (button mashing, plug/unplug, a combo
+    opening right after a refresh) restart a short single-shot timer and
+    only the last one spawns rkdeveloptool.
+    """
+    timer = getattr(gui, '_partition_debounce_timer', None)
+    if timer is None:
+        timer = QTimer(gui)
+        timer.setSingleShot(True)
+        timer.timeout.connect(safe_slot(lambda: _do_read_partition_table(gui)))
+        gui._partition_debounce_timer = timer
+    timer.start(_PARTITION_DEBOUNCE_MS)
+
+
+def _do_read_partition_table(gui):
+    """Start the background partition read (see read_partition_table)"""
     try:
         if getattr(gui, '_partition_refresh_lock', False):
             gui.log_message(gui.tr('reading_partitions_already'))
             return
 
+        if is_storage_probe_running(gui):
+            # Read once the probes are done (_on_storage_probe_finished)
+            gui._partition_read_pending = True
+            gui.log_message(gui.tr('storage_probe_running'))
+            return
+
         if hasattr(gui, 'splitter'):
             gui._splitter_sizes_prev = gui.splitter.sizes()
 
@@ -262,32 +492,44 @@ def read_partition_table(gui):
             return
 
         gui._partition_refresh_lock = True
-        gui.partition_worker = PartitionPPTWorker()
-        gui.partition_worker.finished.connect(safe_slot(lambda out, code: on_partition_ppt_finished(gui, out, code)))
-        gui.partition_worker.start()
+        try:
+            _start_partition_worker(gui)
+        except Exception as e:
+            # Never fall back to a synchronous `ppt` on the GUI thread - it
+            # would freeze the window for up to the tool's timeout. Retry the
+            # worker once from the event loop instead; the lock stays held
+            # until that attempt finishes.
+            gui.log_message(f"[WARNING] Failed to start partition read: {e}")
+            QTimer.singleShot(_PARTITION_RETRY_MS, lambda: _retry_partition_worker(gui))
 
         gui.log_message(gui.tr('reading_partitions'))
         gui.statusBar().showMessage(gui.tr('reading_partitions'))
 
-    except Exception:
-        gui._partition_refresh_lock = True
-        try:
-            env = os.environ.copy()
-            env['NO_COLOR'] = '1'
-            env['CLICOLOR'] = '0'
-            env['CLICOLOR_FORCE'] = '0'
-            result = subprocess.run([RKTOOL, "ppt"], capture_output=True, text=True, timeout=5, env=env)
-            if result.returncode == 0:
-                gui.partitions = parse_partition_info(result.stdout)
-                populate_partition_table(gui)
-                populate_partition_combo(gui)
-                populate_address_combo(gui)
-                gui.log_message(gui.tr('partition_read_ok'))
-        except Exception:
-            pass
-        finally:
-            gui._partition_refresh_lock = False
-            gui._restore_splitter_sizes()
+    except Exception as e:
+        gui.log_message(f"[WARNING] Failed to start partition read: {e}")
+        gui._partition_refresh_lock = False
+        gui._restore_splitter_sizes()
+
+
+# Delay before the single retry of a partition read whose worker failed to start
+_PARTITION_RETRY_MS = 250
+
+
+def _start_partition_worker(gui):
+    """Start a PartitionPPTWorker whose result goes to on_partition_ppt_finished"""
+    gui.partition_worker = PartitionPPTWorker()
+    gui.partition_worker.finished.connect(safe_slot(lambda out, code: on_partition_ppt_finished(gui, out, code)))
+    gui.partition_worker.start()
+
+
+def _retry_partition_worker(gui):
+    """Second and last attempt to start the partition read; releases the lock on failure"""
+    try:
+        _start_partition_worker(gui)
+    except Exception as e:
+        gui.log_message(f"[WARNING] Failed to start partition read: {e}")
+        gui._partition_refresh_lock = False
+        gui._restore_splitter_sizes()
 
 
 def on_partition_ppt_finished(gui, out, code):
@@ -295,9 +537,7 @@ def on_partition_ppt_finished(gui, out, code):
     try:
         if code == 0 and out:
             gui.partitions = parse_partition_info(out)
-            populate_partition_table(gui)
-            populate_partition_combo(gui)
-            populate_address_combo(gui)
+            populate_partition_views(gui)
             gui.log_message(gui.tr('partition_read_ok'))
             gui.statusBar().showMessage(gui.tr('partition_read_ok'))
         else:
@@ -310,53 +550,40 @@ def on_partition_ppt_finished(gui, out, code):
         gui._partition_refresh_lock = False
 
 
-def populate_partition_table(gui):
-    """Populate partition table widget"""
-    gui.partition_table.setRowCount(0)
-    gui._restore_splitter_sizes()
-
-    if not gui.partitions:
-        return
-
-    items = list(gui.partitions.items())
-    gui.partition_table.setRowCount(len(items))
+def populate_partition_views(gui):
+    """Fill the partition table and both partition pickers from gui.partitions.
 
-    for row, (name, info) in enumerate(items):
-        addr = info.get('address', '')
-        size = info.get('size', '')
-
-        from PySide6.QtWidgets import QTableWidgetItem, QWidget, QHBoxLayout, QPushButton
-
-        gui.partition_table.setItem(row, 0, QTableWidgetItem(name))
-        gui.partition_table.setItem(row, 1, QTableWidgetItem(addr))
-        gui.partition_table.setItem(row, 2, QTableWidgetItem(size))
-
-        action_widget = QWidget()
-        action_layout = QHBoxLayout(action_widget)
-        action_layout.setContentsMargins(0, 0, 0, 0)
+    One pass over the parsed partitions builds the table rows and the combo
+    labels/keys together; each widget is then filled from those lists.
+    """
+    rows, labels, names = [], [], []
+    for name, info in gui.partitions.items():
+        rows.append((name, info['address'], info['size']))
+        labels.append(info['display'])
+        names.append(name)
+    gui._partition_rows = rows
+    populate_partition_table(gui)
+    populate_partition_combo(gui, (labels, names))
+    populate_address_combo(gui, (labels, names))
 
-        backup_btn = QPushButton(gui.tr('action_backup'))
-        write_btn = QPushButton(gui.tr('action_write'))
 
-        backup_btn.clicked.connect(safe_slot(lambda checked=False, n=name: backup_partition_by_name(gui, n)))
-        write_btn.clicked.connect(safe_slot(lambda checked=False, n=name: write_partition_by_name(gui, n)))
+def populate_partition_table(gui):
+    """Populate partition table from gui._partition_rows.
 
-        action_layout.addWidget(backup_btn)
-        action_layout.addWidget(write_btn)
+    The rows go to the PartitionTableModel in one reset and the action column
+    is painted by PartitionActionDelegate, so no per-row widgets are built.
+    Re-reading an unchanged partition table is a no-op.
+    """
+    gui._restore_splitter_sizes()
 
-        gui.partition_table.setCellWidget(row, 3, action_widget)
-
-    try:
-        gui.partition_table.resizeColumnsToContents()
-        gui.partition_table.resizeRowsToContents()
-        gui.partition_table.horizontalHeader().setStretchLastSection(True)
-    except (RuntimeError, AttributeError) as e:
-        print(f"Warning: Failed to resize partition table: {e}")
+    # Column widths come from the header's Stretch mode set at creation, so
+    # there is no per-refill resizeColumnsToContents() pass over every cell.
+    gui.partition_model.set_rows(gui._partition_rows)
 
 
 def backup_partition_by_name(gui, name):
     """Backup partition by name"""
-    save_path, _ = QFileDialog.getSaveFileName(gui, gui.tr('save_file_dialog'), f"{name}.bin")
+    save_path, _ = QFileDialog.getSaveFileName(gui, gui.tr('save_file_dialog'), f"{name}.bin", options=file_dialog_options())
     if not save_path:
         return
 
@@ -378,13 +605,29 @@ def backup_partition_by_name(gui, name):
     except (AttributeError, RuntimeError) as e:
         print(f"Warning: Failed to check manual address: {e}")
 
+    _backup_partition_to(gui, name, save_path)
+
+
+def _backup_partition_to(gui, name, save_path, prefetch=None):
+    """Read partition `name` into save_path.
+
+    The last partition's length depends on the flash capacity; if that is
+    still being queried in the background, finish once the query is done
+    (called again with the finished query as prefetch) instead of blocking
+    the GUI thread on it.
+    """
     if name in gui.partitions:
         info = gui.partitions[name]
         addr = info.get('address')
-        length_arg = _partition_length_arg(gui, info)
+        length_arg = _partition_length_arg(gui, info, prefetch)
         if addr and length_arg:
             gui.run_command([RKTOOL, "rl", addr, length_arg, save_path], "backing_up")
             return
+        query = getattr(gui, '_flash_info_worker', None)
+        if prefetch is None and addr and query is not None and query.isRunning():
+            gui.log_message(gui.tr('reading_flash_info'))
+            _when_finished(query, lambda: _backup_partition_to(gui, name, save_path, prefetch=query))
+            return
         gui.log_message(f"[WARNING] Could not determine size of partition '{name}'; backup aborted.")
 
     gui.show_message("Warning", "select_partition", "Warning")
@@ -392,8 +635,9 @@ def backup_partition_by_name(gui, name):
 
 def write_partition_by_name(gui, name):
     """Write partition by name"""
-    file_path, _ = QFileDialog.getOpenFileName(gui, gui.tr('browse_btn'), "", gui.tr('file_dialog_image'))
-    if not file_path or not os.path.exists(file_path):
+    file_path, _ = QFileDialog.getOpenFileName(gui, gui.tr('browse_btn'), "", gui.tr('file_dialog_image'), options=file_dialog_options())
+    st = _stat_or_none(file_path)
+    if st is None:
         return
 
     try:
@@ -405,18 +649,18 @@ def write_partition_by_name(gui, name):
             if _is_sector_zero(addr) and is_rkfw_image(file_path):
                 gui.show_message("rkfw_detected_title", "rkfw_detected_message", "Critical")
                 return
-            if not confirm_burn_operation(gui, file_path, addr):
-                return
-            gui.run_command([RKTOOL, "wl", addr, file_path], "burning")
+            confirm_burn_operation(gui, file_path, addr,
+                                   lambda: gui.run_command([RKTOOL, "wl", addr, file_path], "burning"),
+                                   st)
             return
     except (AttributeError, RuntimeError) as e:
         print(f"Warning: Failed to check manual address: {e}")
 
     if name:
         addr = gui.partitions.get(name, {}).get('address', name) if hasattr(gui, 'partitions') else name
-        if not confirm_burn_operation(gui, file_path, addr):
-            return
-        gui.run_command([RKTOOL, "wlx", name, file_path], "burning")
+        confirm_burn_operation(gui, file_path, addr,
+                               lambda: gui.run_command([RKTOOL, "wlx", name, file_path], "burning"),
+                               st)
         return
 
     gui.show_message("Warning", "select_partition", "Warning")
@@ -425,15 +669,16 @@ def write_partition_by_name(gui, name):
 def onekey_burn(gui):
     """One-click burn firmware"""
     firmware_path = gui.firmware_path.text()
-    if not firmware_path or not os.path.exists(firmware_path):
+    st = _stat_or_none(firmware_path)
+    if st is None:
         gui.show_message("Warning", "select_firmware_file", "Warning")
         return
     if is_rkfw_image(firmware_path):
         _flash_rkfw_firmware(gui, firmware_path)
         return
-    if not confirm_burn_operation(gui, firmware_path, "0x0"):
-        return
-    gui.run_command([RKTOOL, "wl", "0x0", firmware_path], "burning")
+    confirm_burn_operation(gui, firmware_path, "0x0",
+                           lambda: gui.run_command([RKTOOL, "wl", "0x0", firmware_path], "burning"),
+                           st)
 
 
 def _show_rkfw_message(gui, title_key, text, icon="Critical"):
@@ -587,7 +832,8 @@ def load_loader(gui):
     # If loader path not set or file doesn't exist, ask user to select
     if not loader_path or not os.path.exists(loader_path):
         loader_path, _ = QFileDialog.getOpenFileName(
-            gui, gui.tr("select_loader_file"), "", gui.tr("file_dialog_loader")
+            gui, gui.tr("select_loader_file"), "", gui.tr("file_dialog_loader"),
+            options=file_dialog_options()
         )
         if not loader_path:
             return
@@ -614,42 +860,48 @@ def load_loader(gui):
     else:
         cmd_type = "db"
     
-    gui.run_command([RKTOOL, cmd_type, loader_path], "loading_loader")
-    
-    # Mark that we're attempting to load loader and wrap the finished signal
-    if gui.command_worker:
-        def on_loader_finished(success, error_msg):
-            if success:
-                gui.loader_loaded = True
-                gui.log_message("[OK] " + gui.tr("loader_loaded_success"))
+    try:
+        loader_fp = quick_file_fingerprint(loader_path)
+    except OSError:
+        loader_fp = None
+
+    def on_loader_finished(success, _output):
+        if success:
+            gui.loader_loaded = True
+            gui.log_message("[OK] " + gui.tr("loader_loaded_success"))
+            # The same loader on the same device exposes the same storage;
+            # unplugging forgets the detected types, so they're only kept
+            # while the device stays connected.
+            same_loader = (loader_fp is not None
+                           and getattr(gui, '_last_loader_fp', None) == loader_fp
+                           and getattr(gui, '_supported_storages', None))
+            if not same_loader:
                 # Re-detect storage types now that loader is loaded
                 # This allows hardware like SD cards and SSDs to be recognized
                 gui.log_message("[INFO] Re-detecting storage types...")
+                forget_storage_types(gui)
                 detect_supported_storage_types(gui)
-            gui.on_command_finished(success, error_msg)
-        
-        try:
-            gui.command_worker.finished_signal.disconnect()
-        except RuntimeError:
-            # Signal not connected, which is fine
-            pass
-        gui.command_worker.finished_signal.connect(safe_slot(on_loader_finished))
+            gui._last_loader_fp = loader_fp
+
+    # Mark that we're attempting to load loader
+    gui.run_command([RKTOOL, cmd_type, loader_path], "loading_loader", on_loader_finished)
 
 
 def burn_image(gui):
     """Burn custom image"""
     image_path = gui.image_path.text()
-    if not image_path or not os.path.exists(image_path):
+    st = _stat_or_none(image_path)
+    if st is None:
         gui.show_message("Warning", "select_image_address", "Warning")
         return
 
-    address = gui.address_combo.currentText()
-    if gui.tr("custom_address") in address:
+    choice = gui.address_combo.currentData()
+    if choice == ADDRESS_CUSTOM:
         address = gui.custom_address.text()
+    elif choice == ADDRESS_FULL_FIRMWARE:
+        address = "0x0"
     else:
-        match = re.search(r'\((\S+)\)', address)
-        if match:
-            address = match.group(1)
+        address = gui.partitions.get(choice, {}).get('address', '')
 
     if not address:
         gui.show_message("Warning", "select_image_address", "Warning")
@@ -659,50 +911,122 @@ def burn_image(gui):
         gui.show_message("rkfw_detected_title", "rkfw_detected_message", "Critical")
         return
 
-    if not confirm_burn_operation(gui, image_path, address):
-        return
+    confirm_burn_operation(gui, image_path, address,
+                           lambda: gui.run_command([RKTOOL, "wl", address, image_path], "burning"),
+                           st)
+
+
+# Images smaller than this are hashed on the GUI thread before the burn prompt
+_SYNC_DIGEST_MAX = 16 * _MB_BYTES
 
-    gui.run_command([RKTOOL, "wl", address, image_path], "burning")
 
+def _digest_worker_for(gui, file_path):
+    """Running DigestWorker for file_path, reusing one already hashing it.
 
-def confirm_burn_operation(gui, file_path, address):
-    """Show confirmation dialog before burning with storage information"""
+    Workers stay referenced in gui._digest_workers until they finish, so a
+    dialog answered (and opened again) before hashing is done never drops
+    the last reference to a running thread.
+    """
+    workers = gui.__dict__.setdefault('_digest_workers', [])
+    for worker in workers:
+        if worker.file_path == file_path and worker.isRunning():
+            return worker
+    worker = DigestWorker(file_path)
+    workers.append(worker)
+    worker.finished.connect(functools.partial(_forget_digest_worker, gui, worker))
+    worker.start()
+    return worker
+
+
+def _forget_digest_worker(gui, worker):
+    """Drop a finished DigestWorker (see _digest_worker_for)"""
+    worker.wait()  # finished is emitted just before the thread really ends
+    try:
+        gui._digest_workers.remove(worker)
+    except ValueError:
+        pass
+
+
+def confirm_burn_operation(gui, file_path, address, on_confirmed, stat_result=None):
+    """Show confirmation dialog before burning with storage information.
+
+    The dialog is opened window-modal and this returns immediately;
+    on_confirmed() is called if the user answers Yes. No nested event loop
+    runs meanwhile, so background workers keep delivering their results.
+
+    The digest of a large image is computed by a DigestWorker while the dialog
+    is already on screen, so it doesn't freeze the window before it appears;
+    until it arrives a quick head/tail fingerprint identifies the file. Files
+    under _SYNC_DIGEST_MAX are hashed inline.
+
+    stat_result: the caller's own os.stat() of file_path; it is reused for
+    the size and the digest cache key instead of stat'ing the file again.
+    """
     try:
-        file_size = os.path.getsize(file_path)
+        st = stat_result if stat_result is not None else os.stat(file_path)
+        file_size = st.st_size
         file_name = os.path.basename(file_path)
         size_str = format_file_size(file_size)
-        md5sum = calculate_file_md5(file_path)
-        
+
         # Get current storage information
         current_storage_code = gui.change_storage_combo.currentData()
         current_storage_name = gui.change_storage_combo.currentText()
         storage_info = get_storage_info(gui, current_storage_code) if current_storage_code else {}
 
-        msg = QMessageBox()
-        style_messagebox(msg)
-        msg.setWindowTitle(gui.tr("confirm_burn_title"))
-        msg.setIcon(QMessageBox.Icon.Question)
+        msg = _confirm_box(gui, gui.tr("confirm_burn_title"))
+
+        # Format everything around the digest line once; the text is set
+        # again when the digest arrives.
+        templates = _confirm_templates(gui)
+        text_head = templates['burn_head'].substitute(
+            name=file_name, size=size_str, size_bytes=f"{file_size:,}", address=address
+        )
+        text_tail = templates['burn_tail'].substitute(
+            storage=current_storage_name, storage_type=storage_info.get('type', 'Unknown')
+        )
 
-        detail_text = f"""
-{gui.tr("burn_confirmation_message")}
+        def set_detail_text(digest_line):
+            msg.setText(text_head + digest_line + text_tail)
 
-{gui.tr("file_name")}: {file_name}
-{gui.tr("file_size")}: {size_str} ({file_size:,} bytes)
-{gui.tr("target_address")}: {address}
-MD5: {md5sum}
+        worker = None
 
-{gui.tr("storage_type")}: {current_storage_name} ({storage_info.get('type', 'Unknown')})
+        def on_digest(digest_algo, digest):
+            set_detail_text(f"{digest_algo}: {digest}")
 
-{gui.tr("confirm_proceed")}
-        """
+        def on_finished(_result):
+            msg.finished.disconnect(on_finished)
+            if worker is not None:
+                try:
+                    worker.done.disconnect(on_digest)
+                except (RuntimeError, TypeError):
+                    pass
+            if msg.standardButton(msg.clickedButton()) == QMessageBox.StandardButton.Yes:
+                on_confirmed()
+
+        if file_size < _SYNC_DIGEST_MAX:
+            # Hashing a small file costs less than a thread round-trip
+            try:
+                digest_algo, digest = calculate_file_digest(file_path, st)
+            except Exception as e:
+                digest_algo, digest = "MD5", f"error: {e}"
+            set_detail_text(f"{digest_algo}: {digest}")
+        else:
+            # Reading a multi-GB image takes a while; identify it right away
+            # from its ends and let the full digest fill in when it's ready.
+            try:
+                quick = f"{gui.tr('quick_fingerprint')}: {quick_file_fingerprint(file_path, st)}\n"
+            except OSError:
+                quick = ""
+            set_detail_text(quick + gui.tr("digest_computing"))
 
-        msg.setText(detail_text)
-        msg.setStandardButtons(QMessageBox.StandardButton.No | QMessageBox.StandardButton.Yes)
-        msg.setMinimumWidth(550)
-        # Clear focus to prevent button highlighting
-        msg.setFocus()
+            worker = _digest_worker_for(gui, file_path)
+            worker.done.connect(on_digest)
+            # A reused worker may have finished just before the connect
+            if worker.result is not None:
+                on_digest(*worker.result)
 
-        return msg.exec() == QMessageBox.StandardButton.Yes
+        msg.finished.connect(on_finished)
+        msg.open()
 
     except Exception as e:
         gui.log_message(f"[WARNING] Confirmation dialog error: {e}")
@@ -710,7 +1034,29 @@ MD5: {md5sum}
             gui, gui.tr("confirm_burn_title"), gui.tr("confirm_burn_simple"),
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
-        return reply == QMessageBox.StandardButton.Yes
+        if reply == QMessageBox.StandardButton.Yes:
+            on_confirmed()
+
+
+# Storage types supported by rkdeveloptool 1.32
+# These are the officially documented storage types
+_STORAGE_TYPES = {
+    '1': {'name': 'EMMC', 'code': '1', 'type': 'eMMC Flash'},
+    '2': {'name': 'SD Card', 'code': '2', 'type': 'SD Card'},
+    '9': {'name': 'SPI NOR', 'code': '9', 'type': 'SPI NOR Flash'},
+    # For newer rkdeveloptool versions (uncomment if your version supports these):
+    # '3': {'name': 'UFS', 'code': '3', 'type': 'Universal Flash Storage'},
+    # '4': {'name': 'NAND', 'code': '4', 'type': 'NAND Flash'},
+    # '10': {'name': 'NVMe SSD', 'code': '10', 'type': 'NVMe Solid State Drive'},
+}
+
+
+def _default_storages():
+    """Storage types that are most likely available when detection can't tell"""
+    return {
+        '1': {'name': 'EMMC', 'code': '1', 'type': 'eMMC Flash', 'enabled': True},
+        '9': {'name': 'SPI NOR', 'code': '9', 'type': 'SPI NOR Flash', 'enabled': True},
+    }
 
 
 def detect_supported_storage_types(gui):
@@ -723,24 +1069,15 @@ def detect_supported_storage_types(gui):
     
     Supported storage types depend on rkdeveloptool version and device hardware:
     - rkdeveloptool 1.32: EMMC (1), SD (2), SPINOR (9)
+
+    The `cs` probes run in a StorageProbeWorker; until it reports back the
+    combo shows the default types and device commands are held off (see
+    is_storage_probe_running). The device capability (`rcb`, cached on
+    gui._device_capability) is checked first so a loader that can't switch
+    storage isn't probed at all.
     """
     try:
         if not hasattr(gui, '_supported_storages'):
-            # Storage types supported by rkdeveloptool 1.32
-            # These are the officially documented storage types
-            all_types = {
-                '1': {'name': 'EMMC', 'code': '1', 'type': 'eMMC Flash'},
-                '2': {'name': 'SD Card', 'code': '2', 'type': 'SD Card'},
-                '9': {'name': 'SPI NOR', 'code': '9', 'type': 'SPI NOR Flash'},
-                # For newer rkdeveloptool versions (uncomment if your version supports these):
-                # '3': {'name': 'UFS', 'code': '3', 'type': 'Universal Flash Storage'},
-                # '4': {'name': 'NAND', 'code': '4', 'type': 'NAND Flash'},
-                # '10': {'name': 'NVMe SSD', 'code': '10', 'type': 'NVMe Solid State Drive'},
-            }
-            
-            # Start with empty dict - will be populated by detection
-            gui._supported_storages = {}
-            
             # Check if device is in Maskrom mode without Loader
             # In this mode, storage detection won't work
             is_maskrom_no_loader = (
@@ -751,85 +1088,140 @@ def detect_supported_storage_types(gui):
             if is_maskrom_no_loader:
                 gui.log_message("[WARNING] Device in Maskrom mode - load firmware to detect storage types")
                 # Use default types that are most likely available
-                gui._supported_storages = {
-                    '1': {'name': 'EMMC', 'code': '1', 'type': 'eMMC Flash', 'enabled': True},
-                    '9': {'name': 'SPI NOR', 'code': '9', 'type': 'SPI NOR Flash', 'enabled': True},
-                }
+                gui._supported_storages = _default_storages()
             else:
                 # Test which storage types are actually available
                 # by attempting to switch to each one
-                available = []
-                for code, info in all_types.items():
-                    try:
-                        env = os.environ.copy()
-                        env['NO_COLOR'] = '1'
-                        env['CLICOLOR'] = '0'
-                        env['CLICOLOR_FORCE'] = '0'
-                        result = subprocess.run(
-                            [RKTOOL, "cs", code],
-                            capture_output=True,
-                            text=True,
-                            timeout=3,
-                            env=env
-                        )
-                        output = (result.stdout or "") + (result.stderr or "")
-                        
-                        # Check for explicit success or failure
-                        has_not_available = "is not available" in output
-                        has_ok = "Change Storage OK" in output
-                        
-                        # Success if has "OK" or no "not available" message
-                        is_success = has_ok or (not has_not_available and result.returncode == 0)
-                        
-                        if is_success and not has_not_available:
-                            gui._supported_storages[code] = {
-                                'name': info['name'],
-                                'code': code,
-                                'type': info['type'],
-                                'enabled': True
-                            }
-                            available.append(f"{info['name']} ({code})")
-                            gui.log_message(f"Storage {code}: {info['name']}")
-                        else:
-                            # Only log if explicitly not available
-                            if has_not_available:
-                                gui.log_message(f"Storage {code}: {info['name']} not available")
-                    except Exception as e:
-                        gui.log_message(f"Storage {code} error: {str(e)[:50]}")
-                
-                if available:
-                    gui.log_message(f"[INFO] Detected {len(available)} storage type(s): {', '.join(available)}")
-                elif gui._supported_storages:
-                    # Some were added despite errors
-                    gui.log_message(f"[INFO] Detected storage types: {', '.join([info['name'] for info in gui._supported_storages.values()])}")
-                else:
-                    # No storage detected - use defaults
-                    gui._supported_storages = {
-                        '1': {'name': 'EMMC', 'code': '1', 'type': 'eMMC Flash', 'enabled': True},
-                        '9': {'name': 'SPI NOR', 'code': '9', 'type': 'SPI NOR Flash', 'enabled': True},
-                    }
-                    gui.log_message("[INFO] Using default storage types (EMMC, SPI NOR)")
-                    gui.log_message("[INFO] If your device has other storage, check:")
-                    gui.log_message("   - Is eMMC/SD physically installed on the board?")
-                    gui.log_message("   - Is rkdeveloptool up to date? (current: 1.32)")
+                # A probe already running is left to finish; if it was started
+                # before forget_storage_types(), its results are dropped and
+                # detection runs again from _on_storage_probe_finished.
+                if not is_storage_probe_running(gui):
+                    worker = StorageProbeWorker(_STORAGE_TYPES, getattr(gui, '_device_capability', None))
+                    worker.generation = getattr(gui, '_storage_generation', 0)
+                    worker.finished.connect(safe_slot(
+                        lambda results: _on_storage_probe_finished(gui, results, worker)
+                    ))
+                    gui._storage_probe_worker = worker
+                    gui._storage_probing = True
+                    gui._update_action_states()
+                    worker.start()
         
         # Update UI combo box with detected types
         update_storage_combo(gui)
     except Exception as e:
         # Fallback to basic types if detection fails
-        import sys
         print(f"Warning: Storage detection failed: {e}", file=sys.stderr)
         if not hasattr(gui, '_supported_storages'):
-            gui._supported_storages = {
-                '1': {'name': 'EMMC', 'code': '1', 'type': 'eMMC Flash', 'enabled': True},
-                '9': {'name': 'SPI NOR', 'code': '9', 'type': 'SPI NOR Flash', 'enabled': True},
-            }
+            gui._supported_storages = _default_storages()
         try:
             update_storage_combo(gui)
         except (AttributeError, RuntimeError) as e:
             print(f"Warning: Failed to update storage combo: {e}")
 
 
+def forget_storage_types(gui):
+    """Drop the detected storage types so the next detection probes again.
+
+    Detection otherwise runs once and is reused for the whole session. The
+    cached capability goes too: it differs between Maskrom and the loader.
+    So does the last loaded loader, so loading it again probes afresh
+    instead of keeping whatever types were filled in meanwhile.
+    """
+    if hasattr(gui, '_supported_storages'):
+        del gui._supported_storages
+    gui._device_capability = None
+    gui._last_loader_fp = None
+    # A probe still running belongs to the old state
+    gui._storage_generation = getattr(gui, '_storage_generation', 0) + 1
+
+
+def is_storage_probe_running(gui):
+    """True while the `cs` storage probes run.
+
+    Each probe switches the device's active storage, so any other device
+    command started meanwhile could land on the wrong storage or collide
+    with a probe on the USB device.
+    """
+    return getattr(gui, '_storage_probing', False)
+
+
+def _on_storage_probe_finished(gui, results, worker):
+    """Turn StorageProbeWorker results into gui._supported_storages"""
+    gui._storage_probing = False
+    gui._update_action_states()
+    if worker.generation != getattr(gui, '_storage_generation', 0):
+        # Started before the storage types were forgotten (device unplugged,
+        # loader loaded): the results are stale. The thread is only returning
+        # from run() now, so it is safe to wait for before replacing it.
+        worker.wait()
+        if getattr(gui, 'current_device', None):
+            gui.log_message("[INFO] Re-detecting storage types...")
+            detect_supported_storage_types(gui)
+    elif getattr(gui, 'current_device', None):
+        _apply_storage_probe_results(gui, results, worker.capability)
+    if getattr(gui, '_partition_read_pending', False) and not is_storage_probe_running(gui):
+        gui._partition_read_pending = False
+        if getattr(gui, 'current_device', None):
+            _do_read_partition_table(gui)
+
+
+def _apply_storage_probe_results(gui, results, capability=None):
+    """Store probe results as gui._supported_storages and refresh the combo"""
+    if capability:
+        gui._device_capability = capability
+        if capability.get('switch_storage') is False:
+            gui._supported_storages = _default_storages()
+            gui.log_message("[INFO] Loader cannot switch storage - using default storage types")
+            try:
+                update_storage_combo(gui)
+            except (AttributeError, RuntimeError) as e:
+                print(f"Warning: Failed to update storage combo: {e}")
+            return
+    supported = {}
+    available = []
+    for code, returncode, output, error in results:
+        info = _STORAGE_TYPES[code]
+        if error is not None:
+            gui.log_message(f"Storage {code} error: {error[:50]}")
+            continue
+
+        # Check for explicit success or failure
+        has_not_available = "is not available" in output
+        has_ok = "Change Storage OK" in output
+
+        # Success if has "OK" or no "not available" message
+        is_success = has_ok or (not has_not_available and returncode == 0)
+
+        if is_success and not has_not_available:
+            supported[code] = {
+                'name': info['name'],
+                'code': code,
+                'type': info['type'],
+                'enabled': True
+            }
+            available.append(f"{info['name']} ({code})")
+            gui.log_message(f"Storage {code}: {info['name']}")
+        elif has_not_available:
+            # Only log if explicitly not available
+            gui.log_message(f"Storage {code}: {info['name']} not available")
+
+    if available:
+        gui.log_message(f"[INFO] Detected {len(available)} storage type(s): {', '.join(available)}")
+    else:
+        # No storage detected - use defaults
+        supported = _default_storages()
+        gui.log_message("[INFO] Using default storage types (EMMC, SPI NOR)")
+        gui.log_message("[INFO] If your device has other storage, check:")
+        gui.log_message("   - Is eMMC/SD physically installed on the board?")
+        gui.log_message("   - Is rkdeveloptool up to date? (current: 1.32)")
+
+    gui._supported_storages = supported
+    try:
+        update_storage_combo(gui)
+    except (AttributeError, RuntimeError) as e:
+        print(f"Warning: Failed to update storage combo: {e}")
+
+
 def update_storage_combo(gui):
     """
     Update storage combo box with detected/available storage types.
@@ -839,33 +1231,34 @@ def update_storage_combo(gui):
             return
         
         # Get supported storages
-        supported = getattr(gui, '_supported_storages', {
-            '1': {'name': 'EMMC', 'code': '1', 'type': 'eMMC Flash', 'enabled': True},
-            '9': {'name': 'SPI NOR', 'code': '9', 'type': 'SPI NOR Flash', 'enabled': True},
-        })
-        
-        # Store previous selection
-        prev_text = gui.change_storage_combo.currentText()
-        prev_data = gui.change_storage_combo.currentData()
-        
-        # Clear and repopulate combo box
-        gui.change_storage_combo.clear()
+        supported = getattr(gui, '_supported_storages', None) or _default_storages()
         
         # Sort by code number for consistent ordering
-        sorted_items = sorted(supported.items(), key=lambda x: int(x[0]))
-        
-        for code, storage_info in sorted_items:
-            if storage_info.get('enabled', True):
-                gui.change_storage_combo.addItem(
-                    storage_info['name'],
-                    storage_info['code']  # Use the code as data
-                )
-        
-        # Try to restore previous selection
-        if prev_data:
-            idx = gui.change_storage_combo.findData(prev_data)
-            if idx >= 0:
-                gui.change_storage_combo.setCurrentIndex(idx)
+        items = [
+            (storage_info['name'], storage_info['code'])  # Use the code as data
+            for code, storage_info in sorted(supported.items(), key=lambda x: int(x[0]))
+            if storage_info.get('enabled', True)
+        ]
+
+        combo = gui.change_storage_combo
+        # Called on every device poll - leave an up-to-date combo alone
+        if items == [(combo.itemText(i), combo.itemData(i)) for i in range(combo.count())]:
+            return
+
+        # Store previous selection
+        prev_data = combo.currentData()
+
+        # Clear and repopulate combo box without a signal per intermediate step
+        with QSignalBlocker(combo):
+            combo.clear()
+            for name, code in items:
+                combo.addItem(name, code)
+
+            # Try to restore previous selection
+            if prev_data:
+                idx = combo.findData(prev_data)
+                if idx >= 0:
+                    combo.setCurrentIndex(idx)
         
     except Exception as e:
         gui.log_message(f"[WARNING] Error updating storage combo: {e}")
@@ -891,9 +1284,7 @@ def get_storage_info(gui, storage_code):
 
 def read_flash_id(gui):
     """Read Flash ID and display in dialog"""
-    from .utils import parse_flash_id
-    from .workers import CommandWorker
-    
+
     def on_flash_id_finished(success, output):
         if not success:
             gui.log_message("[ERROR] Failed to read Flash ID")
@@ -917,12 +1308,7 @@ def read_flash_id(gui):
             gui.log_message(info_text)
             
             # Show in message box only (don't overwrite device_info_text)
-            msg = QMessageBox()
-            style_messagebox(msg)
-            msg.setWindowTitle(gui.tr("flash_id_info"))
-            msg.setIcon(QMessageBox.Icon.Information)
-            msg.setText(info_text)
-            msg.exec()
+            _show_info_box(gui, gui.tr("flash_id_info"), info_text)
         else:
             gui.log_message("[WARNING] Could not parse Flash ID information")
     
@@ -931,9 +1317,7 @@ def read_flash_id(gui):
 
 def read_capability(gui):
     """Read device capability information and display in dialog"""
-    from .utils import parse_capability, format_capability_info
-    from .workers import CommandWorker
-    
+
     def on_capability_finished(success, output):
         if not success:
             gui.log_message("[ERROR] Failed to read device capability")
@@ -953,12 +1337,7 @@ def read_capability(gui):
                 gui.device_info_text.setText(info_text)
             
             # Show in message box
-            msg = QMessageBox()
-            style_messagebox(msg)
-            msg.setWindowTitle(gui.tr("device_capability"))
-            msg.setIcon(QMessageBox.Icon.Information)
-            msg.setText(info_text)
-            msg.exec()
+            _show_info_box(gui, gui.tr("device_capability"), info_text)
         else:
             gui.log_message("[WARNING] Could not parse device capability information")
     
@@ -967,8 +1346,7 @@ def read_capability(gui):
 
 def show_flash_info_detailed(gui):
     """Show detailed flash information in a dialog"""
-    from .utils import parse_flash_info
-    
+
     def on_flash_info_finished(success, output):
         if not success:
             gui.log_message("[ERROR] Failed to read Flash information")
@@ -987,51 +1365,43 @@ def show_flash_info_detailed(gui):
     gui.run_command([RKTOOL, "rfi"], "reading_flash_info", on_flash_info_finished)
 
 
+# (flash_info key, label) in the order the detailed flash dialog lists them
+_FLASH_FIELDS = (
+    ('manufacturer', 'Manufacturer'),
+    ('capacity', 'Capacity'),
+    ('id', 'Flash ID'),
+    ('flash_type', 'Type'),
+    ('block_size', 'Block Size'),
+    ('page_size', 'Page Size'),
+    ('health_status', 'Health'),
+    ('wear_level', 'Wear Level'),
+)
+
+
 def _display_flash_info_dialog(gui):
     """Display cached flash information in a dialog"""
-    from .utils import format_flash_info_detailed
-    
+
     if hasattr(gui, '_cached_flash_info') and gui._cached_flash_info:
         flash_info = gui._cached_flash_info
         
-        # Build detailed info text
-        info_text = "Detailed Flash Information:\n\n"
-        
-        # Basic information
-        if 'manufacturer' in flash_info:
-            info_text += f"  Manufacturer: {flash_info['manufacturer']}\n"
-        if 'capacity' in flash_info:
-            info_text += f"  Capacity: {flash_info['capacity']}\n"
-        if 'id' in flash_info:
-            info_text += f"  Flash ID: {flash_info['id']}\n"
-        
-        # Additional fields that might be present
-        if 'flash_type' in flash_info:
-            info_text += f"  Type: {flash_info['flash_type']}\n"
-        if 'block_size' in flash_info:
-            info_text += f"  Block Size: {flash_info['block_size']}\n"
-        if 'page_size' in flash_info:
-            info_text += f"  Page Size: {flash_info['page_size']}\n"
-        if 'health_status' in flash_info:
-            info_text += f"  Health: {flash_info['health_status']}\n"
-        if 'wear_level' in flash_info:
-            info_text += f"  Wear Level: {flash_info['wear_level']}\n"
+        # Build detailed info text: basic information, then the additional
+        # fields that might be present
+        parts = ["Detailed Flash Information:\n\n"]
+        for key, label in _FLASH_FIELDS:
+            value = flash_info.get(key)
+            if value is not None:
+                parts.append(f"  {label}: {value}\n")
+        info_text = "".join(parts)
         
         gui.log_message(info_text)
         
         # Show in message box only (don't overwrite device_info_text)
-        msg = QMessageBox()
-        style_messagebox(msg)
-        msg.setWindowTitle(gui.tr("flash_info_detailed"))
-        msg.setIcon(QMessageBox.Icon.Information)
-        msg.setText(info_text)
-        msg.exec()
+        _show_info_box(gui, gui.tr("flash_info_detailed"), info_text)
 
 
 def get_security_info(gui):
     """Get device security information and display in dialog"""
-    from .utils import parse_security_info, format_security_info
-    
+
     def on_security_info_finished(success, output):
         if not success:
             gui.log_message("[ERROR] Failed to read security information")
@@ -1046,12 +1416,7 @@ def get_security_info(gui):
             gui.log_message(info_text)
             
             # Show in message box
-            msg = QMessageBox()
-            style_messagebox(msg)
-            msg.setWindowTitle(gui.tr("security_info"))
-            msg.setIcon(QMessageBox.Icon.Information)
-            msg.setText(info_text)
-            msg.exec()
+            _show_info_box(gui, gui.tr("security_info"), info_text)
         else:
             gui.log_message("[WARNING] Could not parse security information")
     
@@ -1065,8 +1430,7 @@ def test_device_connection(gui, test_count=10):
         gui: The main GUI instance
         test_count: Number of tests to run (default: 10)
     """
-    from .utils import format_test_results
-    
+
     # Initialize test state
     test_state = {
         'total': test_count,
@@ -1255,7 +1619,8 @@ def pack_firmware(gui):
         gui,
         gui.tr("save_packed_firmware") if hasattr(gui, 'tr') else "Save packed firmware",
         "firmware.img",
-        "Image Files (*.img);;All Files (*)"
+        "Image Files (*.img);;All Files (*)",
+        options=file_dialog_options()
     )
     if not output_path:
         return
@@ -1283,7 +1648,8 @@ def unpack_firmware(gui):
         gui,
         gui.tr("select_firmware_to_unpack") if hasattr(gui, 'tr') else "Select firmware package",
         "",
-        "Image Files (*.img *.uimg);;All Files (*)"
+        "Image Files (*.img *.uimg);;All Files (*)",
+        options=file_dialog_options()
     )
     if not input_file or not os.path.exists(input_file):
         return
@@ -1333,7 +1699,8 @@ def export_gpt_table(gui):
         gui,
         gui.tr("save_gpt_table") if hasattr(gui, 'tr') else "Save GPT table",
         "gpt.bin",
-        "Binary Files (*.bin);;All Files (*)"
+        "Binary Files (*.bin);;All Files (*)",
+        options=file_dialog_options()
     )
     if not output_path:
         return
@@ -1361,7 +1728,8 @@ def import_gpt_table(gui):
         gui,
         gui.tr("select_gpt_file") if hasattr(gui, 'tr') else "Select GPT table file",
         "",
-        "Binary Files (*.bin);;All Files (*)"
+        "Binary Files (*.bin);;All Files (*)",
+        options=file_dialog_options()
     )
     if not input_file or not os.path.exists(input_file):
         return
@@ -1455,7 +1823,8 @@ def download_boot(gui):
         gui,
         gui.tr("select_boot_file") if hasattr(gui, 'tr') else "Select Boot File",
         "",
-        "Boot Files (*.bin);;All Files (*)"
+        "Boot Files (*.bin);;All Files (*)",
+        options=file_dialog_options()
     )
     
     if not boot_file or not os.path.exists(boot_file):
@@ -1491,7 +1860,8 @@ def upload_boot(gui):
         gui,
         gui.tr("save_boot_file") if hasattr(gui, 'tr') else "Save Boot File",
         "boot.bin",
-        "Binary Files (*.bin);;All Files (*)"
+        "Binary Files (*.bin);;All Files (*)",
+        options=file_dialog_options()
     )
     
     if not output_path:
@@ -1516,8 +1886,7 @@ def show_usb_device_info(gui):
     
     Displays VID/PID, serial number, bus information, etc.
     """
-    import subprocess
-    
+
     def on_finished(success, output):
         if success and output:
             gui.log_message(f"[OK] {gui.tr('reading_usb_info') if hasattr(gui, 'tr') else 'USB information'}")
@@ -1583,7 +1952,8 @@ def export_logs_detailed(gui):
         gui,
         gui.tr("export_logs") if hasattr(gui, 'tr') else "Export Logs",
         f"rkdevtool_logs_{timestamp}.zip",
-        "ZIP Files (*.zip);;All Files (*)"
+        "ZIP Files (*.zip);;All Files (*)",
+        options=file_dialog_options()
     )
     
     if not output_path:
@@ -1612,7 +1982,6 @@ Connected Devices:
             zf.writestr('device_info.txt', device_info)
             
             # Add system information
-            import platform
             system_info = f"""System Information Report
 Generated: {datetime.now().isoformat()}
 
@@ -1640,12 +2009,12 @@ Python Version: {platform.python_version()}
 # Export all operation functions
 __all__ = [
     'enter_maskrom_mode', 'enter_loader_mode', 'reset_device',
-    'read_device_info', 'get_detailed_device_info', 'get_flash_capacity_bytes',
+    'read_device_info', 'get_detailed_device_info', 'get_flash_capacity_bytes', 'request_flash_capacity',
     'read_partition_table', 'backup_firmware',
     'onekey_burn', 'load_loader', 'burn_image',
     'on_partition_ppt_finished', 'backup_partition_by_name',
     'write_partition_by_name', 'confirm_burn_operation',
-    'detect_supported_storage_types', 'update_storage_combo', 'get_storage_info',
+    'detect_supported_storage_types', 'forget_storage_types', 'is_storage_probe_running', 'update_storage_combo', 'get_storage_info',
     'read_flash_id', 'read_capability', 'show_flash_info_detailed',
     'get_security_info', 'test_device_connection',
     'erase_partition', 'erase_all_storage',
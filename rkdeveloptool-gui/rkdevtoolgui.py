@@ -4,10 +4,10 @@ Cross-platform Rockchip flashing tool with modern interface
 """
 import sys
 import os
-import tempfile
-import math
 import locale
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 # Nuitka-compiled builds on Python 3.14 can crash inside CPython's warnings
 # machinery (SystemError: funcobject.c:446 -> segfault) when a warning is
@@ -20,26 +20,32 @@ from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QFontDatabase
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTabWidget, QListWidget, QTextEdit, QFileDialog, QLabel, QLineEdit,
-    QProgressBar, QMessageBox, QComboBox, QGroupBox, QGridLayout, QCheckBox,
-    QSplitter, QTableWidget, QTableWidgetItem, QSpinBox, QTextBrowser,
-    QScrollArea, QHeaderView, QSizePolicy, QInputDialog
+    QTabWidget, QFileDialog, QLabel, QLineEdit, QMessageBox, QComboBox,
+    QSplitter, QScrollArea, QSizePolicy
 )
 
 # Import our modularized components
-from .utils import (
-    RKTOOL, ToolValidator, parse_flash_info, calculate_file_md5,
-    format_file_size, parse_partition_info, safe_slot, parse_chip_info
-)
-from .workers import DeviceWorker, PartitionPPTWorker, CommandWorker
-from .widgets import AutoLoadCombo
+from .utils import ToolValidator, verify_digest_function, safe_slot, parse_chip_info
+from .workers import DeviceWorker, CommandWorker
+from .widgets import file_dialog_options
 from .i18n import TRANSLATIONS
 from .themes import ThemeManager, ThemeAutoManager
-from .operations import style_messagebox
+from .operations import (
+    style_messagebox, forget_storage_types, detect_supported_storage_types, load_loader,
+    is_storage_probe_running
+)
 from .log_widget import RealtimeLogWidget
+from .ui_panels import (
+    create_device_panel, create_mode_panel, create_quick_panel,
+    create_home_tab, create_download_tab, create_partition_tab,
+    create_parameter_tab, create_upgrade_tab, create_advanced_tab, save_log
+)
+from .ui_text_updates import update_all_ui_text
 
 
 class TranslationManager:
+    # tr() runs for every label on every refresh; slots keep it off __dict__
+    __slots__ = ('_lang', '_active', 'auto_mode', 'translations')
 
     @staticmethod
     def detect_system_language():
@@ -93,13 +99,23 @@ class TranslationManager:
         if lang is None or lang == 'auto':
             lang = self.detect_system_language()
         
+        self.translations = TRANSLATIONS
         self.lang = lang
         self.auto_mode = False
-        self.translations = TRANSLATIONS
+
+    @property
+    def lang(self):
+        return self._lang
+
+    @lang.setter
+    def lang(self, lang):
+        # Resolve the active table here, once, rather than on every tr() call
+        self._lang = lang
+        self._active = self.translations.get(lang, {})
 
     def tr(self, key):
         """Returns the translated string for a given key."""
-        return self.translations.get(self.lang, {}).get(key, key)
+        return self._active.get(key, key)
 
     def set_language(self, lang):
         """Sets the active language."""
@@ -112,19 +128,30 @@ class TranslationManager:
 
 
 class RKDevToolGUI(QMainWindow):
+    # Connection-state style sheets, swapped only when the state flips
+    _STATUS_STYLE_CONNECTED = "QLabel { color: #28a745; padding: 5px; font-weight: bold; }"
+    _STATUS_STYLE_DISCONNECTED = "QLabel { padding: 5px; }"
+    _BANNER_STYLE_CONNECTED = "QLabel { padding: 4px 2px; font-weight: bold; color: #28a745; }"
+    _BANNER_STYLE_DISCONNECTED = "QLabel { padding: 4px 2px; font-weight: bold; color: #888888; }"
+    # DeviceWorker mode -> status text key
+    _MODE_KEYS = {"Maskrom": "connected_maskrom", "Loader": "connected_loader"}
+
     def __init__(self, manager):
         super().__init__()
         self.manager = manager
         self.tr = self.manager.tr
+        self._translate_status_texts()
 
         # State
         self.partitions = {}
+        self._partition_rows = []
         self.connected_devices = []
         self.current_device = None
         self.device_mode = "not_connected_status"
         self.chip_info = "unknown_chip"
         self.device_worker = None
         self.command_worker = None
+        self._mirror_command_log = False
         self.partition_worker = None
         self.mass_workers = []
         self.mass_production_active = False
@@ -173,13 +200,16 @@ class RKDevToolGUI(QMainWindow):
         # Status bar
         self.create_status_bar()
 
-        # Initialize automatic theme manager (after UI is created)
-        self.theme_auto_manager = ThemeAutoManager(self, enable_auto=True)
-
-        # Update UI text
+        # Update UI text (before the first paint, so no untranslated labels show)
         self.update_ui_text()
 
-        # Start device detection
+        # The system theme query and the first device scan can wait until the
+        # window has been painted
+        QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        """Start the automatic theme manager and device detection"""
+        self.theme_auto_manager = ThemeAutoManager(self, enable_auto=True)
         self.start_device_detection()
 
     def set_application_font(self):
@@ -199,8 +229,6 @@ class RKDevToolGUI(QMainWindow):
 
     def create_left_panel(self):
         """Create left sidebar with device info and quick actions"""
-        from .ui_panels import create_device_panel, create_mode_panel, create_quick_panel
-
         panel = QWidget()
         layout = QVBoxLayout(panel)
 
@@ -233,12 +261,6 @@ class RKDevToolGUI(QMainWindow):
 
     def create_right_panel(self):
         """Create right main panel with tabs"""
-        from .ui_panels import (
-            create_home_tab, create_download_tab, create_partition_tab,
-            create_parameter_tab, create_upgrade_tab, create_advanced_tab,
-            create_log_panel
-        )
-
         panel = QWidget()
         layout = QVBoxLayout(panel)
 
@@ -289,6 +311,8 @@ class RKDevToolGUI(QMainWindow):
         self.partition_tab = partition_tab
         self.partition_list_group = partition_widgets['list_group']
         self.partition_table = partition_widgets['table']
+        self.partition_model = partition_widgets['model']
+        self.partition_action_delegate = partition_widgets['action_delegate']
         self.refresh_partitions_btn = partition_widgets['refresh_btn']
         self.partition_ops_group = partition_widgets['ops_group']
         self.partition_combo = partition_widgets['combo']
@@ -431,7 +455,6 @@ class RKDevToolGUI(QMainWindow):
         self.save_log_btn = self.log_widget.export_btn
         
         # Set up export callback
-        from .ui_panels import save_log
         self.log_widget.set_export_callback(
             safe_slot(lambda: save_log(self))
         )
@@ -553,7 +576,7 @@ class RKDevToolGUI(QMainWindow):
 
     def update_ui_text(self):
         """Update all UI text based on current language"""
-        from .ui_text_updates import update_all_ui_text
+        self._translate_status_texts()
         update_all_ui_text(self)
 
     # Device management methods
@@ -574,14 +597,14 @@ class RKDevToolGUI(QMainWindow):
 
     def on_device_found(self, devices, mode, chip_info):
         """Handle device found event"""
-        from .operations import detect_supported_storage_types
-        
         self.connected_devices = devices
         self.device_mode = mode
         self.chip_info = chip_info
+        # One batched insert, painted once
+        self.device_list.setUpdatesEnabled(False)
         self.device_list.clear()
-        for device in devices:
-            self.device_list.addItem(device)
+        self.device_list.addItems(devices)
+        self.device_list.setUpdatesEnabled(True)
         if devices:
             self.device_list.setCurrentRow(0)
             self.current_device = devices[0]
@@ -613,6 +636,7 @@ class RKDevToolGUI(QMainWindow):
         self.loader_loaded = False
         self.maskrom_device_shown_hint = False
         self._cached_flash_info = None
+        forget_storage_types(self)
         self.update_device_status()
 
     # Buttons / inputs that only make sense when a device is connected.
@@ -640,53 +664,90 @@ class RKDevToolGUI(QMainWindow):
         enabled because they don't need a live device.
         """
         connected = self.current_device is not None
-        hint = "" if connected else self.tr("connect_device_first")
+        # The storage probes switch the device's storage; nothing else may
+        # talk to the device until they are done.
+        probing = is_storage_probe_running(self)
+        if not connected:
+            hint = self.tr("connect_device_first")
+        elif probing:
+            hint = self.tr("storage_probe_running")
+        else:
+            hint = ""
+        enabled = connected and not probing
         for attr in self._DEVICE_DEPENDENT_WIDGETS:
             widget = getattr(self, attr, None)
             if widget is None:
                 continue
-            widget.setEnabled(connected)
+            widget.setEnabled(enabled)
             widget.setToolTip(hint)
 
+    def _translate_status_texts(self):
+        """Translate the fixed strings update_device_status shows, once per
+        language (called at startup and from update_ui_text())"""
+        tr = self.tr
+        self._ready_prefix = tr('ready_status') + tr('status_line_delimiter')
+        self._t_chip = tr('chip')
+        self._t_unknown_chip = tr('unknown_chip')
+        self._t_connected = tr('connected')
+        self._t_not_connected = tr('not_connected')
+        self._t_detecting = tr('detecting_device')
+        self._t_chip_unknown_line = f"{self._t_chip}: {self._t_unknown_chip}"
+        self._t_status_disconnected = self._ready_prefix + tr('not_connected_status')
+        self._t_banner_disconnected = tr('home_banner_disconnected')
+        self._t_modes = {mode: tr(key) for mode, key in self._MODE_KEYS.items()}
+
     def update_device_status(self):
-        """Update device status display"""
+        """Update device status display.
+
+        Runs on every device poll (every ~2s), so the fixed strings come
+        pre-translated from _translate_status_texts() and the label / banner
+        style sheets - which force a re-polish - are only set again when the
+        connection state flips.
+        """
         self._update_action_states()
-        if self.current_device:
-            mode_text = self.tr(f"connected_{self.device_mode.lower()}")
+        connected = bool(self.current_device)
+        restyle = connected != getattr(self, '_status_connected', None)
+        self._status_connected = connected
+        if connected:
+            mode_text = self._t_modes.get(self.device_mode)
+            if mode_text is None:
+                mode_text = self.tr(f"connected_{self.device_mode.lower()}")
             # Parse chip info to show readable chip name
-            chip_text = parse_chip_info(self.chip_info) if self.chip_info else self.tr('unknown_chip')
+            chip_text = parse_chip_info(self.chip_info) if self.chip_info else self._t_unknown_chip
+            chip_line = f"{self._t_chip}: {chip_text}"
             self.device_status_label.setText(mode_text)
-            self.device_status_label.setStyleSheet("QLabel { color: #28a745; padding: 5px; font-weight: bold; }")
-            self.chip_info_label.setText(f"{self.tr('chip')}: {chip_text}")
-            self.statusBar().showMessage(f"{self.tr('ready_status')}{self.tr('status_line_delimiter')}{mode_text}")
-            self.connection_status.setText(f"{self.tr('connected')}")
-            self._update_home_banner(True, f"{mode_text} · {self.tr('chip')}: {chip_text}")
+            if restyle:
+                self.device_status_label.setStyleSheet(self._STATUS_STYLE_CONNECTED)
+            self.chip_info_label.setText(chip_line)
+            self.statusBar().showMessage(self._ready_prefix + mode_text)
+            self.connection_status.setText(self._t_connected)
+            self._update_home_banner(True, f"{mode_text} · {chip_line}", restyle)
         else:
-            self.device_status_label.setText(self.tr("detecting_device"))
-            self.device_status_label.setStyleSheet("QLabel { padding: 5px; }")
-            self.chip_info_label.setText(f"{self.tr('chip')}: {self.tr('unknown_chip')}")
-            self.statusBar().showMessage(
-                f"{self.tr('ready_status')}{self.tr('status_line_delimiter')}{self.tr('not_connected_status')}")
-            self.connection_status.setText(f"{self.tr('not_connected')}")
-            self._update_home_banner(False, f"{self.tr('home_banner_disconnected')}")
-
-    def _update_home_banner(self, connected, text):
+            self.device_status_label.setText(self._t_detecting)
+            if restyle:
+                self.device_status_label.setStyleSheet(self._STATUS_STYLE_DISCONNECTED)
+            self.chip_info_label.setText(self._t_chip_unknown_line)
+            self.statusBar().showMessage(self._t_status_disconnected)
+            self.connection_status.setText(self._t_not_connected)
+            self._update_home_banner(False, self._t_banner_disconnected, restyle)
+
+    def _update_home_banner(self, connected, text, restyle=True):
         """Update the home tab connection banner (plain text, native look)."""
         banner = getattr(self, 'home_status_banner', None)
         if banner is None:
             return
-        color = "#28a745" if connected else "#888888"
-        banner.setStyleSheet(f"QLabel {{ padding: 4px 2px; font-weight: bold; color: {color}; }}")
+        if restyle:
+            banner.setStyleSheet(self._BANNER_STYLE_CONNECTED if connected else self._BANNER_STYLE_DISCONNECTED)
         banner.setText(text)
 
     # Utility methods
     def log_message(self, message):
-        """Add message to real-time log output"""
+        """Add message to real-time log output (the widget scrolls itself)"""
         self.log_widget.add_log(message)
-        # Also append to text browser for backward compatibility
-        self.log_output.verticalScrollBar().setValue(
-            self.log_output.verticalScrollBar().maximum()
-        )
+
+    def log_messages(self, messages):
+        """Add a batch of messages to the log output in one display update"""
+        self.log_widget.add_logs(messages)
 
     def show_message(self, title_key, message_key, icon="Information"):
         """Show message box"""
@@ -708,28 +769,55 @@ class RKDevToolGUI(QMainWindow):
 
     def register_browse(self, button, line_edit, filter_key=None, save=False):
         """Helper to connect a browse button to a line_edit"""
+        button.clicked.connect(partial(self._browse, line_edit, filter_key, save))
 
-        def _on_browse():
-            if save:
-                file_path, _ = QFileDialog.getSaveFileName(
-                    self, self.tr("save_file_dialog"), "",
-                    self.tr(filter_key) if filter_key else ""
-                )
-            else:
-                file_filter = self.tr(filter_key) if filter_key else ""
-                file_path, _ = QFileDialog.getOpenFileName(
-                    self, self.tr("browse_btn"), "", file_filter
-                )
-            if file_path:
-                line_edit.setText(file_path)
+    def _browse(self, line_edit, filter_key, save, _checked=False):
+        """Pick a file for line_edit (see register_browse).
 
-        button.clicked.connect(safe_slot(_on_browse))
+        Titles and filters are translated per click, so the dialog follows a
+        language switch without re-registering the buttons.
+        """
+        file_filter = self.tr(filter_key) if filter_key else ""
+        if save:
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, self.tr("save_file_dialog"), "", file_filter,
+                options=file_dialog_options()
+            )
+        else:
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, self.tr("browse_btn"), "", file_filter,
+                options=file_dialog_options()
+            )
+        if file_path:
+            line_edit.setText(file_path)
+
+    def _get_command_worker(self):
+        """Return the window's CommandWorker, creating it and wiring its signals once"""
+        worker = self.command_worker
+        if worker is None:
+            worker = CommandWorker(None, None, self.manager)
+            # Use safe_slot for all signal connections to handle thread-safety
+            worker.progress.connect(safe_slot(lambda v: self.progress_bar.setValue(v)))
+            worker.log.connect(safe_slot(self._on_command_log))
+            worker.finished_signal.connect(safe_slot(self.on_command_finished))
+            self.command_worker = worker
+        return worker
+
+    def _on_command_log(self, lines):
+        """Log a batch of command output, mirroring it to the device info box if asked"""
+        self.log_messages(lines)
+        if self._mirror_command_log:
+            self.device_info_text.append("\n".join(lines))
 
     def run_command(self, cmd, description_key, callback=None):
         """Run command in background worker with optional callback"""
-        if self.command_worker and self.command_worker.isRunning():
+        worker = self._get_command_worker()
+        if worker.isRunning():
             self.show_message("Warning", "command_already_running", "Warning")
             return
+        if is_storage_probe_running(self):
+            self.show_message("Warning", "storage_probe_running", "Warning")
+            return
 
         self.progress_bar.setValue(0)
         self.progress_label.setText(self.tr('ready'))
@@ -738,31 +826,20 @@ class RKDevToolGUI(QMainWindow):
         if hasattr(self, 'equiv_command_field'):
             self.equiv_command_field.setText(' '.join(str(c) for c in cmd))
 
-        self.command_worker = CommandWorker(cmd, description_key, self.manager)
-        # Use safe_slot for all signal connections to handle thread-safety
-        self.command_worker.progress.connect(safe_slot(lambda v: self.progress_bar.setValue(v)))
-        self.command_worker.log.connect(safe_slot(self.log_message))
-
-        # Mirror to device info text if reading device info
-        if description_key == 'reading_device_info' and hasattr(self, 'device_info_text'):
-            self.device_info_text.clear()
-            self.device_info_text.append(self.tr('reading_device_info'))
-            self.command_worker.log.connect(safe_slot(lambda s: self.device_info_text.append(s)))
-        
-        # Mirror to device info text if reading device capability
-        if description_key == 'reading_device_capability' and hasattr(self, 'device_info_text'):
+        # Mirror to device info text if reading device info / capability
+        self._mirror_command_log = (
+            description_key in ('reading_device_info', 'reading_device_capability')
+            and hasattr(self, 'device_info_text')
+        )
+        if self._mirror_command_log:
             self.device_info_text.clear()
-            self.device_info_text.append(self.tr('reading_device_capability'))
-            self.command_worker.log.connect(safe_slot(lambda s: self.device_info_text.append(s)))
+            self.device_info_text.append(self.tr(description_key))
 
         # Store callback if provided
-        if callback:
-            self._command_callback = callback
-        else:
-            self._command_callback = None
+        self._command_callback = callback
 
-        self.command_worker.finished_signal.connect(safe_slot(self.on_command_finished))
-        self.command_worker.start()
+        worker.prepare(cmd, description_key)
+        worker.start()
 
     def on_command_finished(self, success, error_msg):
         """Handle command completion"""
@@ -793,20 +870,43 @@ class RKDevToolGUI(QMainWindow):
 
     def _handle_verification_result(self, success):
         """Handle verification command result"""
-        tmpfile = getattr(self, '_verify_tmpfile', None)
-        expected = getattr(self, '_verify_expected_file', None)
+        # Popping clears the verification state in the same step, so later
+        # commands don't come back here
+        state = self.__dict__
+        tmpfile = state.pop('_verify_tmpfile', None)
+        expected = state.pop('_verify_expected_file', None)
 
         if tmpfile and expected and success and os.path.exists(tmpfile):
             try:
-                md5_tmp = calculate_file_md5(tmpfile)
-                md5_expected = calculate_file_md5(expected)
+                # Files of different sizes can't match; say so without
+                # reading either of them.
+                size_tmp = os.path.getsize(tmpfile)
+                st_expected = os.stat(expected)
+                if size_tmp != st_expected.st_size:
+                    self.show_message('Warning', 'verification_mismatch', 'Warning')
+                    self.log_message(
+                        f"[ERROR] Verification mismatch: expected {st_expected.st_size:,} bytes, "
+                        f"read back {size_tmp:,} bytes")
+                    return
 
-                if md5_tmp == md5_expected:
+                # The read-back is a fresh temp file every time; don't let it
+                # push the user's images out of the digest cache. The two
+                # files are hashed side by side: hashlib releases the GIL,
+                # and they often live on different disks.
+                algo, digest_fn = verify_digest_function()
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    tmp_future = pool.submit(digest_fn.uncached, tmpfile)
+                    expected_future = pool.submit(digest_fn, expected, st_expected)
+                    digest_tmp = tmp_future.result()
+                    digest_expected = expected_future.result()
+
+                if digest_tmp == digest_expected:
                     self.show_message('Information', 'verification_success')
-                    self.log_message(f"[OK] Verification succeeded: {md5_expected}")
+                    self.log_message(f"[OK] Verification succeeded ({algo}): {digest_expected}")
                 else:
                     self.show_message('Warning', 'verification_mismatch', 'Warning')
-                    self.log_message(f"[ERROR] Verification mismatch: expected {md5_expected}, got {md5_tmp}")
+                    self.log_message(
+                        f"[ERROR] Verification mismatch ({algo}): expected {digest_expected}, got {digest_tmp}")
             except Exception as e:
                 self.log_message(f"[ERROR] Verification failed: {e}")
                 self.show_message('Warning', 'verification_failed', 'Warning')
@@ -817,10 +917,6 @@ class RKDevToolGUI(QMainWindow):
                 except Exception as e:
                     self.log_message(f"[WARNING] Failed to remove temp file: {e}")
 
-        # Clean up verification state
-        self._verify_tmpfile = None
-        self._verify_expected_file = None
-
     def _copy_equiv_command(self):
         """Copy the equivalent rkdeveloptool command to the clipboard."""
         text = self.equiv_command_field.text().strip()
@@ -842,8 +938,6 @@ class RKDevToolGUI(QMainWindow):
 
     def _show_loader_hint(self, is_failure=False):
         """Show hint dialog to load Loader when in Maskrom mode"""
-        from . import operations
-        
         if is_failure:
             # Show warning dialog when command fails
             msg = QMessageBox()
@@ -879,14 +973,12 @@ class RKDevToolGUI(QMainWindow):
 
     def _auto_load_loader(self):
         """Automatically load Loader"""
-        from . import operations
-        
         loader_path = self.loader_path.text()
         if not loader_path or not os.path.exists(loader_path):
             self.show_message("Warning", "select_loader_file", "Warning")
             return
         
-        operations.load_loader(self)
+        load_loader(self)
         self.loader_loaded = True
 
     def cleanup(self):
@@ -900,42 +992,57 @@ class RKDevToolGUI(QMainWindow):
                 except Exception as e:
                     print(f"Failed to stop theme timer: {e}")
 
-            # Stop device worker. Its loop can block up to ~3s in a subprocess call
-            # plus a 2s sleep before it re-checks the stop flag, so give it enough
-            # time to actually exit rather than racing ahead while it's still running.
+            # Ask every worker to stop first, then wait for them, so they shut
+            # down concurrently and the waits overlap instead of adding up.
             if self.device_worker:
                 try:
                     self.device_worker.stop()
-                    if not self.device_worker.wait(6000):
-                        print("Warning: device worker did not stop within timeout")
                 except Exception as e:
                     print(f"Failed to stop device worker: {e}")
 
-            # Stop partition worker
-            if self.partition_worker and self.partition_worker.isRunning():
+            process_workers = list(self.mass_workers)
+            if self.command_worker:
+                process_workers.append(self.command_worker)
+            for w in process_workers:
                 try:
-                    self.partition_worker.wait(1000)
+                    if w.isRunning():
+                        w.terminate_process()
                 except Exception as e:
-                    print(f"Failed to stop partition worker: {e}")
+                    print(f"Failed to stop command worker: {e}")
+
+            # The device worker's loop can block up to ~3s in a subprocess call
+            # plus a 2s sleep before it re-checks the stop flag, so give it enough
+            # time to actually exit rather than racing ahead while it's still running.
+            if self.device_worker and self.device_worker.isRunning():
+                try:
+                    if not self.device_worker.wait(6000):
+                        print("Warning: device worker did not stop within timeout")
+                except Exception as e:
+                    print(f"Failed to stop device worker: {e}")
 
-            # Stop mass workers
-            if self.mass_workers:
-                for w in self.mass_workers:
+            # Partition table read, flash info prefetch (started by backup_firmware),
+            # storage type detection (a few `cs` probes, 3s timeout each) and the
+            # command workers
+            waiting = [
+                self.partition_worker,
+                getattr(self, '_flash_info_worker', None),
+                getattr(self, '_storage_probe_worker', None),
+            ] + process_workers
+            for w in waiting:
+                if w and w.isRunning():
                     try:
-                        if hasattr(w, 'terminate_process'):
-                            w.terminate_process()
                         w.wait(1000)
                     except Exception as e:
-                        print(f"Failed to stop mass worker: {e}")
-
-            # Stop command worker
-            if self.command_worker:
-                try:
-                    if hasattr(self.command_worker, 'terminate_process'):
-                        self.command_worker.terminate_process()
-                    self.command_worker.wait(1000)
-                except Exception as e:
-                    print(f"Failed to stop command worker: {e}")
+                        print(f"Failed to stop {type(w).__name__}: {e}")
+
+            # File hashing for the burn confirmation dialog and the MD5 button
+            # runs inside hashlib/blake3 and can't be interrupted; a running
+            # QThread must not be destroyed with the window, so let it finish.
+            hashing = [getattr(self, '_md5_worker', None)] + list(getattr(self, '_digest_workers', []))
+            for w in hashing:
+                if w and w.isRunning():
+                    print(f"Waiting for {w.file_path} to finish hashing...")
+                    w.wait()
 
             self._partition_refresh_lock = False
         except Exception as e:
@@ -5,7 +5,6 @@ Supports multiple styles: Fusion, Windows, macOS, Material, iOS, etc.
 import sys
 from PySide6.QtWidgets import QApplication, QStyleFactory
 from PySide6.QtGui import QPalette, QColor
-from PySide6.QtCore import Qt
 
 
 # Available styles
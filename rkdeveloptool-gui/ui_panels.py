@@ -2,19 +2,31 @@
 UI Panel creation functions for RKDevelopTool GUI
 Contains all UI panel and tab construction logic
 """
+import os
+import re
+import hashlib
+import tempfile
+import subprocess
+from functools import partial
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton,
     QLabel, QLineEdit, QListWidget, QComboBox, QGroupBox, QCheckBox,
-    QTableWidget, QSpinBox, QTextBrowser, QProgressBar, QHeaderView,
-    QSizePolicy, QMessageBox
+    QTableView, QSpinBox, QTextBrowser, QProgressBar, QHeaderView,
+    QSizePolicy, QMessageBox, QFileDialog
 )
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont
 from PySide6.QtWidgets import QApplication
 
 from .utils import safe_slot
-from .widgets import AutoLoadCombo
+from .widgets import (
+    AutoLoadCombo, PartitionTableModel, PartitionActionDelegate, file_dialog_options
+)
 from . import operations
+from .ui_text_updates import ADDRESS_CUSTOM
+
+# "name (0x...)" partition combo label -> address
+_ADDR_PAREN_RE = re.compile(r'\((\S+)\)')
 
 
 def create_home_tab(gui):
@@ -352,10 +364,20 @@ def create_partition_tab(gui):
     list_group = QGroupBox()
     list_layout = QVBoxLayout()
 
-    partition_table = QTableWidget()
-    partition_table.setColumnCount(4)
+    # Model/view rather than QTableWidget: a refresh is one model reset and
+    # the per-row action buttons are painted by a delegate, not widgets.
+    partition_table = QTableView()
+    partition_model = PartitionTableModel(partition_table)
+    partition_table.setModel(partition_model)
+    partition_action_delegate = PartitionActionDelegate(
+        safe_slot(partial(operations.backup_partition_by_name, gui)),
+        safe_slot(partial(operations.write_partition_by_name, gui)),
+        partition_table,
+    )
+    partition_table.setItemDelegateForColumn(PartitionTableModel.ACTION_COLUMN, partition_action_delegate)
 
-    # Configure table
+    # Configure table: columns share the width once, here, instead of being
+    # measured against their contents on every refill
     header = partition_table.horizontalHeader()
     header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
 
@@ -366,6 +388,8 @@ def create_partition_tab(gui):
     except (AttributeError, RuntimeError) as e:
         print(f"Warning: Could not set partition table font: {e}")
 
+    # Fixed-height rows: no per-cell size hint pass when the table refills
+    partition_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
     partition_table.verticalHeader().setDefaultSectionSize(28)
     partition_table.setMinimumHeight(320)
     partition_table.setMinimumWidth(760)
@@ -449,6 +473,8 @@ def create_partition_tab(gui):
     widgets = {
         'list_group': list_group,
         'table': partition_table,
+        'model': partition_model,
+        'action_delegate': partition_action_delegate,
         'refresh_btn': refresh_btn,
         'ops_group': ops_group,
         'combo': partition_combo,
@@ -935,11 +961,7 @@ def create_log_panel(gui):
 
 def on_address_changed(gui):
     """Handle address combo change"""
-    text = gui.address_combo.currentText()
-    if gui.tr("custom_address") in text:
-        gui.custom_address.setEnabled(True)
-    else:
-        gui.custom_address.setEnabled(False)
+    gui.custom_address.setEnabled(gui.address_combo.currentData() == ADDRESS_CUSTOM)
 
 
 def change_storage(gui):
@@ -956,41 +978,24 @@ def change_storage(gui):
     # Store the storage name for use in callback
     gui._storage_switch_target = storage_name
     
-    # Disconnect previous finished signal if any
-    if gui.command_worker and gui.command_worker.isRunning():
-        try:
-            gui.command_worker.finished_signal.disconnect()
-        except:
-            pass
-    
+    def on_storage_finished(success, _output):
+        """Handle storage change completion and auto-refresh partition table"""
+        target_name = getattr(gui, '_storage_switch_target', 'Storage')
+        if success:
+            gui.log_message(f"[OK] Storage switched to {target_name}")
+            gui.log_message("[INFO] Auto-refreshing partition table...")
+            # Auto-refresh partition table after successful storage switch
+            operations.read_partition_table(gui)
+        else:
+            # The worker has already logged the exit code
+            gui.log_message(f"[ERROR] Failed to switch storage to {target_name}")
+
     # Run the storage change command using standard run_command
-    gui.run_command([RKTOOL, "cs", storage], "changing_storage")
-    
-    # Connect to the finished signal to auto-refresh partitions
-    if gui.command_worker:
-        def on_storage_finished(success, error_msg):
-            """Handle storage change completion and auto-refresh partition table"""
-            target_name = getattr(gui, '_storage_switch_target', 'Storage')
-            if success:
-                gui.log_message(f"[OK] Storage switched to {target_name}")
-                gui.log_message(f"[INFO] Auto-refreshing partition table...")
-                # Auto-refresh partition table after successful storage switch
-                operations.read_partition_table(gui)
-            else:
-                gui.log_message(f"[ERROR] Failed to switch storage: {error_msg if error_msg else 'Unknown error'}")
-            # Call the original on_command_finished
-            gui.on_command_finished(success, error_msg)
-        
-        try:
-            gui.command_worker.finished_signal.disconnect()
-        except:
-            pass
-        gui.command_worker.finished_signal.connect(safe_slot(on_storage_finished))
+    gui.run_command([RKTOOL, "cs", storage], "changing_storage", on_storage_finished)
 
 
 def erase_flash(gui):
     """Erase entire flash"""
-    from PySide6.QtWidgets import QMessageBox, QApplication
     from .utils import RKTOOL
 
     msg = QMessageBox()
@@ -1066,8 +1071,6 @@ def on_flash_info_read(gui, success):
 
 def burn_partition(gui):
     """Burn partition"""
-    import re
-    import os
     from .utils import RKTOOL
 
     selected_partition_key = gui.partition_combo.currentData()
@@ -1099,7 +1102,7 @@ def burn_partition(gui):
         return
 
     # Fallback: parse address
-    match = re.search(r'\((\S+)\)', selected_partition)
+    match = _ADDR_PAREN_RE.search(selected_partition)
     if not match:
         gui.show_message("Warning", "select_partition", "Warning")
         return
@@ -1109,9 +1112,6 @@ def burn_partition(gui):
 
 def backup_partition(gui):
     """Backup partition"""
-    import re
-    import os
-    from PySide6.QtWidgets import QFileDialog
     from .utils import RKTOOL
 
     selected_partition_key = gui.partition_combo.currentData()
@@ -1122,7 +1122,7 @@ def backup_partition(gui):
         gui.show_message("Warning", "select_partition", "Warning")
         return
     if not save_path:
-        save_path, _ = QFileDialog.getSaveFileName(gui, gui.tr("save_file_dialog"))
+        save_path, _ = QFileDialog.getSaveFileName(gui, gui.tr("save_file_dialog"), options=file_dialog_options())
         if not save_path:
             return
 
@@ -1146,7 +1146,7 @@ def backup_partition(gui):
             return
 
     # Fallback
-    match = re.search(r'\((\S+)\)', selected_partition)
+    match = _ADDR_PAREN_RE.search(selected_partition)
     if not match:
         gui.show_message("Warning", "select_partition", "Warning")
         return
@@ -1188,7 +1188,6 @@ def write_gpt(gui):
 def write_parameter(gui):
     """Read device parameters"""
     from .utils import RKTOOL
-    from PySide6.QtWidgets import QApplication
 
     def on_finished(success, output):
         if success and output:
@@ -1220,9 +1219,7 @@ def write_parameter(gui):
 
 def tag_spl(gui):
     """Tag SPL"""
-    import os
     from .utils import RKTOOL
-    from PySide6.QtWidgets import QFileDialog
 
     tag = gui.tagspl_tag.text()
     spl = gui.tagspl_spl_path.text()
@@ -1236,7 +1233,8 @@ def tag_spl(gui):
         gui,
         gui.tr("save_tagged_spl") if hasattr(gui, 'tr') else "Save Tagged SPL File",
         f"spl_tagged_{tag}.bin",
-        "Binary Files (*.bin);;All Files (*)"
+        "Binary Files (*.bin);;All Files (*)",
+        options=file_dialog_options()
     )
     
     if not output_file:
@@ -1245,7 +1243,6 @@ def tag_spl(gui):
     
     # Show confirmation
     msg = QMessageBox()
-    from PySide6.QtWidgets import QApplication
     # Use application palette for automatic theme following
     msg.setPalette(QApplication.palette())
     msg.setWindowTitle(gui.tr("confirm_tag_spl") if hasattr(gui, 'tr') else "Confirm Tag SPL")
@@ -1292,10 +1289,6 @@ def read_flash(gui):
 
 def verify_flash(gui):
     """Verify flash"""
-    import os
-    import math
-    import tempfile
-    import hashlib
     from .utils import RKTOOL
 
     file_path = gui.verify_file_path.text()
@@ -1333,7 +1326,7 @@ def verify_flash(gui):
     if not sector_len_arg:
         try:
             fsize = os.path.getsize(file_path)
-            sectors = math.ceil(fsize / sector_size)
+            sectors = -(-fsize // sector_size)
             sector_len_arg = hex(sectors)
         except:
             sector_len_arg = "0x1000"
@@ -1355,24 +1348,35 @@ def verify_flash(gui):
 
 
 def calculate_md5(gui):
-    """Calculate MD5 of file"""
-    import os
-    from PySide6.QtWidgets import QFileDialog
-    from .utils import calculate_file_md5
+    """Calculate MD5 of file (hashed in a DigestWorker, the GUI stays responsive)"""
+    from .workers import DigestWorker
+
+    worker = getattr(gui, '_md5_worker', None)
+    if worker is not None and worker.isRunning():
+        return
 
     file_path = gui.verify_file_path.text()
     if not file_path or not os.path.exists(file_path):
-        file_path, _ = QFileDialog.getOpenFileName(gui, gui.tr("select_file_dialog"), "", gui.tr("file_dialog_all"))
+        file_path, _ = QFileDialog.getOpenFileName(gui, gui.tr("select_file_dialog"), "", gui.tr("file_dialog_all"), options=file_dialog_options())
         if not file_path:
             return
 
-    try:
-        md5sum = calculate_file_md5(file_path)
-        gui.show_message("Information", f"MD5: {md5sum}")
-        gui.log_message(f"MD5({file_path}) = {md5sum}")
-    except Exception as e:
+    gui.calculate_md5_btn.setEnabled(False)
+    worker = DigestWorker(file_path, md5_only=True)
+    worker.done.connect(safe_slot(partial(_on_md5_done, gui, file_path)))
+    gui._md5_worker = worker
+    worker.start()
+
+
+def _on_md5_done(gui, file_path, _algo, md5sum):
+    """Show the result of calculate_md5()"""
+    gui.calculate_md5_btn.setEnabled(True)
+    if md5sum.startswith("error: "):
         gui.show_message("Warning", "md5_failed")
-        gui.log_message(f"MD5 calculation failed: {e}")
+        gui.log_message(f"MD5 calculation failed: {md5sum[len('error: '):]}")
+        return
+    gui.show_message("Information", f"MD5: {md5sum}")
+    gui.log_message(f"MD5({file_path}) = {md5sum}")
 
 
 def on_verify_sector_changed(gui):
@@ -1408,10 +1412,10 @@ def show_usb_info(gui):
 
 def save_log(gui):
     """Save log to file"""
-    from PySide6.QtWidgets import QFileDialog
 
     file_path, _ = QFileDialog.getSaveFileName(
-        gui, gui.tr("save_log_dialog"), "rkdevtool.log", "Log Files (*.log);;All Files (*)"
+        gui, gui.tr("save_log_dialog"), "rkdevtool.log", "Log Files (*.log);;All Files (*)",
+        options=file_dialog_options()
     )
     if file_path:
         with open(file_path, "w", encoding="utf-8") as f:
@@ -1420,7 +1424,6 @@ def save_log(gui):
 
 def scan_mass_devices(gui):
     """Scan for mass production devices"""
-    import subprocess
     from .utils import RKTOOL
 
     try:
@@ -1440,8 +1443,6 @@ def scan_mass_devices(gui):
 
 def start_mass_production(gui):
     """Start mass production"""
-    import os
-    from PySide6.QtWidgets import QMessageBox
     from .utils import RKTOOL
     from .workers import CommandWorker
 
@@ -1460,9 +1461,12 @@ def start_mass_production(gui):
         gui.show_message("Warning", "select_devices_for_mass", "Warning")
         return
 
+    if operations.is_storage_probe_running(gui):
+        gui.show_message("Warning", "storage_probe_running", "Warning")
+        return
+
     # Confirm
     msg = QMessageBox()
-    from PySide6.QtWidgets import QApplication
     # Use application palette for automatic theme following
     msg.setPalette(QApplication.palette())
     msg.setWindowTitle(gui.tr("confirm_mass_production"))
@@ -1482,7 +1486,7 @@ def start_mass_production(gui):
     for item in selected_items:
         device = item.text()
         worker = CommandWorker([RKTOOL, "wl", "0x0", firmware], "burning", gui.manager)
-        worker.log.connect(safe_slot(lambda msg, d=device: gui.log_message(f"[{d}] {msg}")))
+        worker.log.connect(safe_slot(partial(_log_device_lines, gui, device)))
         worker.finished_signal.connect(safe_slot(lambda s, e, d=device, w=worker: on_mass_device_finished(gui, d, s, e, w)))
         gui.mass_workers.append(worker)
         worker.start()
@@ -1490,6 +1494,11 @@ def start_mass_production(gui):
     gui.mass_progress_label.setText(gui.tr("mass_production_running").format(len(selected_items)))
 
 
+def _log_device_lines(gui, device, lines):
+    """Log a batch of one mass production worker's output"""
+    gui.log_messages([f"[{device}] {msg}" for msg in lines])
+
+
 def stop_mass_production(gui):
     """Stop mass production"""
     gui.mass_production_active = False
@@ -2,6 +2,7 @@
 UI Text update functions for RKDevelopTool GUI
 Updates all UI text when language is changed
 """
+from PySide6.QtCore import QSignalBlocker
 
 
 def update_all_ui_text(gui):
@@ -102,12 +103,13 @@ def update_partition_tab_texts(gui):
     gui.tab_widget.setTabText(2, gui.tr("partition_tab"))
 
     gui.partition_list_group.setTitle(gui.tr("partition_info_group"))
-    gui.partition_table.setHorizontalHeaderLabels([
+    gui.partition_model.set_headers([
         gui.tr("partition_name"),
         gui.tr("start_address"),
         gui.tr("size"),
         gui.tr("action")
     ])
+    gui.partition_action_delegate.set_captions(gui.tr("action_backup"), gui.tr("action_write"))
     gui.refresh_partitions_btn.setText(gui.tr("refresh_partitions_btn"))
 
     gui.partition_ops_group.setTitle(gui.tr("partition_ops_group"))
@@ -252,24 +254,40 @@ def update_statusbar_texts(gui):
     gui.update_device_status()
 
 
-def populate_address_combo(gui):
+# userData of the fixed address combo entries; partition entries carry the
+# partition name. Lets callers identify the choice without the label text.
+ADDRESS_FULL_FIRMWARE = "__full__"
+ADDRESS_CUSTOM = "__custom__"
+
+
+def partition_entries(gui):
+    """Return ([labels], [names]) of the parsed partitions, in table order"""
+    partitions = getattr(gui, 'partitions', None) or {}
+    return [info['display'] for info in partitions.values()], list(partitions)
+
+
+def populate_address_combo(gui, entries=None):
     """Populate address combo box in download tab.
 
     Preserves the user's current selection across language switches: item order
     (full-firmware, custom-address, then partitions) is stable, only the
     displayed label text changes with the language.
+
+    entries: ([labels], [names]) already built by the caller, see
+    partition_entries().
     """
     try:
+        labels, names = entries if entries is not None else partition_entries(gui)
         current_idx = gui.address_combo.currentIndex()
         gui.address_combo.clear()
-        gui.address_combo.addItem(gui.tr("address_full_firmware"))
-        gui.address_combo.addItem(gui.tr("custom_address"))
+        items = [gui.tr("address_full_firmware"), gui.tr("custom_address"), *labels]
+        keys = [ADDRESS_FULL_FIRMWARE, ADDRESS_CUSTOM, *names]
 
-        # Add parsed partitions if available
-        if hasattr(gui, 'partitions') and gui.partitions:
-            for name, info in gui.partitions.items():
-                addr = info.get('address', '')
-                gui.address_combo.addItem(f"{name} ({addr})")
+        # One batched insert instead of a model insert per entry; setting
+        # the item data afterwards doesn't touch the current text.
+        gui.address_combo.addItems(items)
+        for i, key in enumerate(keys):
+            gui.address_combo.setItemData(i, key)
 
         if 0 <= current_idx < gui.address_combo.count():
             gui.address_combo.setCurrentIndex(current_idx)
@@ -277,19 +295,23 @@ def populate_address_combo(gui):
         print(f"Warning: Failed to populate address combo: {e}")
 
 
-def populate_partition_combo(gui):
+def populate_partition_combo(gui, entries=None):
     """Populate partition combo box, preserving the current selection (the
     partition list itself doesn't change with the language, so this only
-    matters when it's called as part of a language-switch retranslate)."""
+    matters when it's called as part of a language-switch retranslate).
+
+    entries: ([labels], [names]) already built by the caller, see
+    partition_entries()."""
     try:
+        labels, names = entries if entries is not None else partition_entries(gui)
         current_idx = gui.partition_combo.currentIndex()
-        gui.partition_combo.clear()
-        if hasattr(gui, 'partitions') and gui.partitions:
-            for name, info in gui.partitions.items():
-                addr = info.get('address', '')
-                display = f"{name} ({addr})"
-                gui.partition_combo.addItem(display, name)
-        if 0 <= current_idx < gui.partition_combo.count():
-            gui.partition_combo.setCurrentIndex(current_idx)
+        # addItems() can't carry the partition key as userData, so keep the
+        # per-item insert but silence the intermediate index changes.
+        with QSignalBlocker(gui.partition_combo):
+            gui.partition_combo.clear()
+            for label, name in zip(labels, names):
+                gui.partition_combo.addItem(label, name)
+            if 0 <= current_idx < gui.partition_combo.count():
+                gui.partition_combo.setCurrentIndex(current_idx)
     except (RuntimeError, AttributeError) as e:
         print(f"Warning: Failed to populate partition combo: {e}")
\ No newline at end of file
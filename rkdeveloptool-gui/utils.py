@@ -4,10 +4,27 @@ Utility functions and helpers for RKDevelopTool GUI
 import re
 import os
 import sys
+import copy
+import json
+import mmap
 import shutil
+import string
 import hashlib
+import functools
+import threading
 import subprocess
 
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:
+    _blake3 = None
+
+_MB_BYTES = 1024 * 1024
+_GB_BYTES = _MB_BYTES * 1024
+
+# Read size used when hashing files without hashlib.file_digest / mmap help.
+_HASH_BLOCK_SIZE = _MB_BYTES
+
 
 def _candidate_tool_dirs():
     """Directories that may hold a bundled rkdeveloptool, most specific first."""
@@ -162,6 +179,32 @@ def parse_chip_info(chip_text):
     return chip_text
 
 
+_FLASH_SIZE_RE = re.compile(
+    r'(?:Flash\s+Size|capacity)\s*:\s*(?:(?P<sectors>\d+)\s*Sectors|(?P<capacity>[0-9.]+\s*(?:MB|GB|KB)))'
+    r'|\bsize\s*:?\s*(?P<size_hex>0x[0-9A-Fa-f]+)',
+    re.I
+)
+_FLASH_SIZE_KEYS = frozenset(('capacity', 'sectors', 'size_hex'))
+
+
+def _memoize_parse(fn):
+    """Memoize a parser of raw rkdeveloptool output on the output text.
+
+    Re-reading an unchanged device (e.g. clicking refresh twice) hands the
+    parsers byte-identical text. Callers get a deep copy, so mutating the
+    result can't corrupt the cache.
+    """
+    cached = functools.lru_cache(maxsize=16)(fn)
+
+    @functools.wraps(fn)
+    def wrapper(text):
+        return copy.deepcopy(cached(text))
+
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+@_memoize_parse
 def parse_flash_info(flash_text):
     """Parse flash info from rkdeveloptool rfi output"""
     if not flash_text:
@@ -174,10 +217,19 @@ def parse_flash_info(flash_text):
     if mfg_match:
         info['manufacturer'] = mfg_match.group(1).strip()
 
-    # Extract Flash Size (first occurrence usually is the main one)
-    size_match = re.search(r'Flash\s+Size\s*:\s*([0-9.]+\s*(?:MB|GB|KB))', flash_text, re.I)
-    if size_match:
-        info['capacity'] = size_match.group(1).strip()
+    # Flash size, in one pass over the text: the first "Flash Size: N MB"
+    # (usually the main one), the exact "Flash Size: N Sectors" newer tools
+    # also print, and the raw "size: 0x..." some loaders report instead.
+    for m in _FLASH_SIZE_RE.finditer(flash_text):
+        kind = m.lastgroup
+        if kind == 'capacity':
+            info.setdefault('capacity', m.group('capacity').strip())
+        elif kind == 'sectors':
+            info.setdefault('sectors', int(m.group('sectors')))
+        else:
+            info.setdefault('size_hex', m.group('size_hex'))
+        if len(info.keys() & _FLASH_SIZE_KEYS) == len(_FLASH_SIZE_KEYS):
+            break
 
     # Extract Block Size
     block_match = re.search(r'Block\s+Size\s*:\s*([0-9.]+\s*(?:KB|MB))', flash_text, re.I)
@@ -229,51 +281,244 @@ def is_rkfw_image(file_path):
         return False
 
 
-def calculate_file_md5(file_path):
-    """Calculate MD5 hash of a file"""
+# Persistent digest cache so re-confirming a burn of the same multi-GB image
+# doesn't stream the whole file again. Entries are keyed on (abs path, size,
+# mtime_ns), so any rewrite of the file invalidates its entry automatically.
+_DIGEST_CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "rkdeveloptool-gui", "md5.json"
+)
+_DIGEST_CACHE_MAX = 64
+_digest_cache = None
+_digest_cache_lock = threading.Lock()
+
+
+def _load_digest_cache():
+    """Return the in-memory digest cache, loading it from disk on first use."""
+    global _digest_cache
+    if _digest_cache is None:
+        try:
+            with open(_DIGEST_CACHE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            _digest_cache = data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            _digest_cache = {}
+    return _digest_cache
+
+
+def _save_digest_cache():
+    """Write the digest cache back to disk (best effort, atomic replace)."""
     try:
-        h = hashlib.md5()
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
+        os.makedirs(os.path.dirname(_DIGEST_CACHE_FILE), exist_ok=True)
+        tmp_path = f"{_DIGEST_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_digest_cache, f)
+        os.replace(tmp_path, _DIGEST_CACHE_FILE)
+    except OSError as e:
+        print(f"Warning: Failed to write digest cache: {e}")
+
+
+def _stat_cached(fn):
+    """Memoize a per-file digest function in an LRU keyed on the file's stat.
+
+    The most recently used entries are kept at the end of the (ordered) dict;
+    the oldest are dropped once the cache exceeds _DIGEST_CACHE_MAX entries.
+    The undecorated function stays reachable as `.uncached` for one-off files
+    (e.g. temporary read-backs) that would only evict useful entries.
+    A caller that has just stat'ed the file can pass the result as st.
+    """
+    @functools.wraps(fn)
+    def wrapper(file_path, st=None):
+        if st is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return fn(file_path)
+        key = f"{fn.__name__}|{os.path.abspath(file_path)}|{st.st_size}|{st.st_mtime_ns}"
+
+        with _digest_cache_lock:
+            cache = _load_digest_cache()
+            digest = cache.pop(key, None)
+            if digest is not None:
+                cache[key] = digest
+                return digest
+
+        digest = fn(file_path)
+
+        with _digest_cache_lock:
+            cache = _load_digest_cache()
+            cache[key] = digest
+            while len(cache) > _DIGEST_CACHE_MAX:
+                cache.pop(next(iter(cache)))
+            _save_digest_cache()
+        return digest
+
+    wrapper.uncached = fn
+    return wrapper
+
+
+def _hashlib_file_digest(file_path, name):
+    """Hex digest of a file with the hashlib algorithm `name`"""
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            # Python 3.11+: OpenSSL reads and hashes the file without a
+            # Python-level loop.
+            return hashlib.file_digest(f, name).hexdigest()
+        h = hashlib.new(name)
+        try:
+            # Hash the mapped pages directly (no per-chunk bytes copies;
+            # hashlib drops the GIL for the whole buffer).
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    # Aggressive readahead, pages dropped early behind us
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                h.update(mm)
+        except (ValueError, OSError, OverflowError):
+            # Empty file, unmappable file or address space too small
+            for chunk in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
                 h.update(chunk)
         return h.hexdigest()
+
+
+@_stat_cached
+def calculate_file_md5(file_path):
+    """Calculate MD5 hash of a file (cached on path, size and mtime)"""
+    try:
+        return _hashlib_file_digest(file_path, 'md5')
     except Exception as e:
         raise Exception(f"MD5 calculation failed: {e}")
 
 
+@_stat_cached
+def _calculate_file_sha256(file_path):
+    """Calculate the SHA-256 hash of a file (OpenSSL uses the CPU's SHA
+    instructions where it has them)"""
+    try:
+        return _hashlib_file_digest(file_path, 'sha256')
+    except Exception as e:
+        raise Exception(f"SHA-256 calculation failed: {e}")
+
+
+@_stat_cached
+def _calculate_file_blake3(file_path):
+    """Calculate the BLAKE3 hash of a file using all available cores"""
+    try:
+        h = _blake3(max_threads=_blake3.AUTO)
+        if hasattr(h, 'update_mmap'):
+            h.update_mmap(file_path)
+        else:
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+                    h.update(chunk)
+        return h.hexdigest()
+    except Exception as e:
+        raise Exception(f"BLAKE3 calculation failed: {e}")
+
+
+def calculate_file_digest(file_path, st=None):
+    """Fingerprint a file for display, preferring BLAKE3 when it is installed.
+
+    st: the file's os.stat() result, if the caller already has it.
+    Returns: (algorithm_name, hex_digest)
+    """
+    if _blake3 is not None:
+        return "BLAKE3", _calculate_file_blake3(file_path, st)
+    return "MD5", calculate_file_md5(file_path, st)
+
+
+_VERIFY_HASHES = ("blake3", "sha256", "md5")
+
+
+def verify_digest_function():
+    """Pick the hash used to compare a read-back with the image it came from.
+
+    BLAKE3 when it is installed, otherwise SHA-256 - both far faster than MD5
+    on current CPUs. RKGUI_VERIFY_HASH=blake3|sha256|md5 overrides the choice.
+    Returns: (algorithm_name, digest function) - the function takes an
+    optional stat result like calculate_file_md5 and has `.uncached`.
+    """
+    choice = os.environ.get("RKGUI_VERIFY_HASH", "").strip().lower()
+    if choice and choice not in _VERIFY_HASHES:
+        print(f"Warning: Ignoring invalid RKGUI_VERIFY_HASH={choice!r} "
+              f"(expected one of {', '.join(_VERIFY_HASHES)})")
+        choice = ""
+    if choice == "md5":
+        return "MD5", calculate_file_md5
+    if choice == "blake3" and _blake3 is None:
+        print("Warning: RKGUI_VERIFY_HASH=blake3 but blake3 is not installed, using SHA-256")
+    if choice == "sha256" or _blake3 is None:
+        return "SHA-256", _calculate_file_sha256
+    return "BLAKE3", _calculate_file_blake3
+
+
+# Bytes hashed from each end of a file by quick_file_fingerprint()
+_FINGERPRINT_WINDOW = 64 * 1024
+_fingerprint_cache = {}
+
+
+def quick_file_fingerprint(file_path, st=None):
+    """Cheap identity check for a (possibly multi-GB) image.
+
+    Hashes the size and the first and last 64 KiB with BLAKE3 (SHA-256 when
+    blake3 isn't installed) - constant work however large the file is, so it
+    can be shown instantly while the full digest is still being computed. It
+    is NOT a content checksum. Cached on path, size and mtime (st: the
+    file's os.stat() result, if the caller already has it).
+    """
+    if st is None:
+        st = os.stat(file_path)
+    key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+    fingerprint = _fingerprint_cache.get(key)
+    if fingerprint is not None:
+        return fingerprint
+
+    h = _blake3() if _blake3 is not None else hashlib.sha256()
+    h.update(st.st_size.to_bytes(8, 'little'))
+    with open(file_path, 'rb') as f:
+        h.update(f.read(_FINGERPRINT_WINDOW))
+        if st.st_size > _FINGERPRINT_WINDOW:
+            f.seek(max(_FINGERPRINT_WINDOW, st.st_size - _FINGERPRINT_WINDOW))
+            h.update(f.read(_FINGERPRINT_WINDOW))
+    fingerprint = h.hexdigest()[:16]
+    _fingerprint_cache[key] = fingerprint
+    return fingerprint
+
+
+@functools.lru_cache(maxsize=256)
 def format_file_size(size_bytes):
-    """Format file size to human readable format"""
-    if size_bytes >= 1024 ** 3:
-        return f"{size_bytes / (1024 ** 3):.2f} GB"
-    elif size_bytes >= 1024 ** 2:
-        return f"{size_bytes / (1024 ** 2):.2f} MB"
+    """Format file size to human readable format (memoized per size)"""
+    if size_bytes >= _GB_BYTES:
+        return f"{size_bytes / _GB_BYTES:.2f} GB"
+    elif size_bytes >= _MB_BYTES:
+        return f"{size_bytes / _MB_BYTES:.2f} MB"
     else:
         return f"{size_bytes / 1024:.2f} KB"
 
 
+_HEX_DIGITS = frozenset(string.hexdigits)
+
+
+@_memoize_parse
 def parse_partition_info(text):
     """Parse output from `rkdeveloptool ppt` and return partition dict
 
     Expected lines like:
     NO  LBA       Name
     00  00002000  security
+
+    Returns {name: {'address', 'size', 'display'}} ordered by start LBA.
     """
     parts = []
     for line in text.splitlines():
-        line = line.strip()
-        if not line:
+        # match lines like: index  LBA  name (whitespace or comma separated)
+        fields = line.replace(',', ' ').split()
+        if len(fields) != 3:
             continue
-        # match lines like: index  LBA  name
-        m = re.match(r'^(?:\d+)[\s,]+([0-9A-Fa-f]+)[\s,]+(\S+)$', line)
-        if m:
-            lba = m.group(1)
-            name = m.group(2)
-            try:
-                start_int = int(lba, 16)
-                addr = hex(start_int)
-            except Exception:
-                addr = f"0x{lba}"
-            parts.append((name, start_int, addr))
+        index, lba, name = fields
+        if not index.isdigit() or not _HEX_DIGITS.issuperset(lba):
+            continue
+        start_int = int(lba, 16)
+        parts.append((name, start_int, hex(start_int)))
 
     # Sort by start_int and build mapping
     parts.sort(key=lambda x: x[1])
@@ -290,7 +535,8 @@ def parse_partition_info(text):
                 size = str(size_val)
         else:
             size = "unknown"
-        partitions[name] = {'address': addr, 'size': size}
+        # 'display' is the "name (address)" label every partition picker shows
+        partitions[name] = {'address': addr, 'size': size, 'display': f"{name} ({addr})"}
 
     return partitions
 
@@ -341,6 +587,7 @@ def safe_slot(fn):
     return slot
 
 
+@_memoize_parse
 def parse_flash_id(output: str) -> dict:
     """Parse Flash ID from rkdeveloptool rid output
     
@@ -370,11 +617,11 @@ def parse_flash_id(output: str) -> dict:
             # Check if it's a valid power of 2
             if capacity_code > 0 and (capacity_code & (capacity_code - 1)) == 0:
                 # It's a power of 2, use as byte multiplier
-                capacity_bytes = capacity_code * (1024 * 1024)  # Assume in MB
-                if capacity_bytes >= 1024 ** 3:
-                    info['capacity'] = f"{capacity_bytes / (1024 ** 3):.1f} GB"
+                capacity_bytes = capacity_code * _MB_BYTES  # Assume in MB
+                if capacity_bytes >= _GB_BYTES:
+                    info['capacity'] = f"{capacity_bytes / _GB_BYTES:.1f} GB"
                 else:
-                    info['capacity'] = f"{capacity_bytes / (1024 ** 2):.0f} MB"
+                    info['capacity'] = f"{capacity_bytes / _MB_BYTES:.0f} MB"
         except (ValueError, KeyError, TypeError) as e:
             print(f"Warning: Could not parse device capacity: {e}")
     
@@ -400,6 +647,13 @@ def parse_capability(output: str) -> dict:
     if cap_match:
         cap_code = cap_match.group(1).strip()
         info['capability_code'] = cap_code
+        # Byte 1, bit 1 flags loader support for switching storage (`cs`)
+        cap_bytes = cap_code.split()
+        if len(cap_bytes) > 1:
+            try:
+                info['switch_storage'] = bool(int(cap_bytes[1], 16) & 0x02)
+            except ValueError:
+                pass
     
     # Extract various capability fields
     patterns = [
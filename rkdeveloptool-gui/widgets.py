@@ -1,7 +1,12 @@
 """
 Custom widgets for RKDevelopTool GUI
 """
-from PySide6.QtWidgets import QComboBox
+import os
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QEvent, QSize
+from PySide6.QtWidgets import (
+    QApplication, QComboBox, QFileDialog, QStyle, QStyledItemDelegate, QStyleOptionButton
+)
 
 
 class AutoLoadCombo(QComboBox):
@@ -21,4 +26,131 @@ class AutoLoadCombo(QComboBox):
                 self._on_open()
         except Exception:
             pass
-        super().showPopup()
\ No newline at end of file
+        super().showPopup()
+
+
+class PartitionTableModel(QAbstractTableModel):
+    """Read-only model behind the partition table.
+
+    Holds one (name, address, size) tuple per partition; the fourth column
+    is left empty for PartitionActionDelegate to draw the row's actions in.
+    """
+
+    ACTION_COLUMN = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = ()
+        self._headers = [""] * 4
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.column() < self.ACTION_COLUMN:
+            return self._rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return None
+
+    def set_headers(self, labels):
+        labels = list(labels)
+        if labels == self._headers:
+            return
+        self._headers = labels
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, len(self._headers) - 1)
+
+    def set_rows(self, rows):
+        """Replace all rows with a single model reset; returns False if unchanged."""
+        rows = tuple(rows)
+        if rows == self._rows:
+            return False
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+        return True
+
+    def row_name(self, row):
+        return self._rows[row][0]
+
+
+class PartitionActionDelegate(QStyledItemDelegate):
+    """Paints the Backup / Write buttons of the partition table's action column.
+
+    Buttons are drawn with the current style instead of being real widgets,
+    so filling the table never creates per-row QWidgets; clicks are mapped
+    back to the row's partition name and passed to on_backup / on_write.
+    """
+
+    MARGIN = 2
+
+    def __init__(self, on_backup, on_write, parent=None):
+        super().__init__(parent)
+        self._callbacks = (on_backup, on_write)
+        self._captions = ("", "")
+
+    def set_captions(self, backup_text, write_text):
+        if (backup_text, write_text) == self._captions:
+            return
+        self._captions = (backup_text, write_text)
+        view = self.parent()
+        if view is not None:
+            view.viewport().update()
+
+    def _button_rects(self, rect):
+        inner = rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        half = inner.width() // 2
+        return (
+            QRect(inner.left(), inner.top(), half - self.MARGIN, inner.height()),
+            QRect(inner.left() + half, inner.top(), inner.width() - half, inner.height()),
+        )
+
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        for rect, text in zip(self._button_rects(option.rect), self._captions):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = text
+            button.fontMetrics = option.fontMetrics
+            button.palette = option.palette
+            button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, widget)
+
+    def sizeHint(self, option, index):
+        metrics = option.fontMetrics
+        width = sum(metrics.horizontalAdvance(text) + 24 for text in self._captions)
+        return QSize(width + 3 * self.MARGIN, metrics.height() + 10)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease,
+                                QEvent.Type.MouseButtonDblClick):
+            return False
+        pos = event.position().toPoint()
+        for rect, callback in zip(self._button_rects(option.rect), self._callbacks):
+            if rect.contains(pos):
+                if (event.type() == QEvent.Type.MouseButtonRelease
+                        and event.button() == Qt.MouseButton.LeftButton):
+                    callback(model.row_name(index.row()))
+                return True
+        return False
+
+
+def file_dialog_options():
+    """Options for the file open/save dialogs.
+
+    Symlinks are never resolved (saves a stat per entry). Setting
+    RKGUI_QT_FILE_DIALOG=1 swaps the platform dialog for Qt's own, which
+    starts much faster on macOS where the native panel spins up QuickLook
+    and iCloud scanning.
+    """
+    options = QFileDialog.Option.DontResolveSymlinks
+    if os.environ.get("RKGUI_QT_FILE_DIALOG") == "1":
+        options |= QFileDialog.Option.DontUseNativeDialog
+    return options
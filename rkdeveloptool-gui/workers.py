@@ -1,12 +1,47 @@
 """
 Background worker threads for RKDevelopTool GUI
 """
+import io
+import codecs
 import subprocess
 import re
 import os
+import queue
+import threading
+import time
 from PySide6.QtCore import QThread, Signal
 
-from .utils import RKTOOL, parse_chip_info
+try:
+    import pyudev
+except ImportError:
+    pyudev = None
+
+from .utils import (
+    RKTOOL, parse_chip_info, parse_capability, calculate_file_digest, calculate_file_md5
+)
+
+# Output cleanup patterns, compiled once - CommandWorker applies them to every
+# line the tool prints.
+_ANSI_ESC_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')  # Binary ESC sequences
+_ANSI_COLOR_RE = re.compile(r'\[[0-9;]*m')  # Text-form color codes [30;41m, [0m, etc.
+_ANSI_CURSOR_RE = re.compile(r'\[[0-9]+[A-K]')  # Text-form cursor/clear codes
+_ANSI_EXTRA_RE = re.compile(r'\[1A\[2K|\[2K|\[1A')  # Additional control codes
+_CHARSET_RE = re.compile(r'\x1b\(.*?\x1b\)')  # Character set selection
+_SHIFT_RE = re.compile(r'\x0f|\x0e')  # Shift out/in
+_PROGRESS_RE = re.compile(r'(\d+)%')
+_LINE_BREAK_RE = re.compile(r'[\r\n]')  # progress redraws end in a bare \r
+# `rfi` prints the exact sector count before block/page size and the rest
+_RFI_SECTORS_RE = re.compile(r'Flash\s+Size\s*:\s*\d+\s*Sectors', re.I)
+# Rockchip's USB vendor ID, as udev spells it in PRODUCT ("2207/350a/100")
+_ROCKCHIP_VID = "2207"
+# With hotplug events, still rescan this often to catch changes that don't
+# re-enumerate the device (e.g. a chip info read that failed)
+_HOTPLUG_RESCAN_SECONDS = 30
+# A device that doesn't answer `rci` is asked again on this many more scans
+_CHIP_INFO_RETRIES = 3
+# Tool output is handed to the GUI thread in batches at most this often
+_LOG_BATCH_SECONDS = 0.05
+_LOG_BATCH_LINES = 64
 
 
 class DeviceWorker(QThread):
@@ -24,43 +59,109 @@ class DeviceWorker(QThread):
 
     def run(self):
         self.running = True
+        # rkdeveloptool has no batch/session mode - every query claims the USB
+        # device anew - so only ask for chip info when the device list changes.
+        self._last_devices = None
+        self._chip_info = None
+        self._chip_retries = 0
+        # Last (devices, mode, chip_info) reported, () once device_lost was
+        # sent: the GUI only hears about changes
+        self._last_state = None
+        # Disable color output
+        env = os.environ.copy()
+        env['NO_COLOR'] = '1'
+        env['CLICOLOR'] = '0'
+        env['CLICOLOR_FORCE'] = '0'
+
+        monitor = self._usb_monitor()
+        if monitor is None:
+            while self.running:
+                self._scan(env)
+                QThread.msleep(2000)
+            return
+
+        # Event driven: only run `ld` when a Rockchip device comes or goes.
+        # The short poll timeout lets stop() take effect promptly.
+        self._scan(env)
+        last_scan = time.monotonic()
         while self.running:
-            try:
-                # Disable color output
+            device = monitor.poll(timeout=0.5)
+            if device is None:
+                if time.monotonic() - last_scan < _HOTPLUG_RESCAN_SECONDS:
+                    continue
+            elif not _is_rockchip_usb(device):
+                continue
+            else:
+                # Give the device a moment to settle and collapse the burst of
+                # events a re-enumeration produces into one scan
+                QThread.msleep(300)
+                while monitor.poll(timeout=0) is not None:
+                    pass
+            self._scan(env)
+            last_scan = time.monotonic()
+
+    def _usb_monitor(self):
+        """udev monitor for USB device events, or None to fall back to polling"""
+        if pyudev is None:
+            return None
+        try:
+            monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+            monitor.filter_by('usb', device_type='usb_device')
+            monitor.start()
+            return monitor
+        except Exception as e:
+            print(f"Warning: USB hotplug monitor unavailable, polling for devices: {e}")
+            return None
+
+    def _scan(self, env):
+        """Run `ld` once and emit device_found / device_lost"""
+        try:
+            result = subprocess.run([RKTOOL, "ld"], capture_output=True, text=True, timeout=3, env=env)
+            lines = result.stdout.strip().splitlines()
+            devices = [l for l in lines if "Did not find any rockusb device" not in l
+                       and "not found" not in l and l.strip()]
+
+            if devices:
+                mode = "unknown_mode"
+                if "MASKROM" in result.stdout.upper():
+                    mode = "Maskrom"
+                elif "LOADER" in result.stdout.upper():
+                    mode = "Loader"
+
+                # Chip info is cached for as long as the device list stays the
+                # same; an unknown chip is only retried a few times
+                if devices != self._last_devices:
+                    self._chip_info = self.get_chip_info(env)
+                    self._chip_retries = 0
+                    self._last_devices = devices
+                elif self._chip_info == "unknown_chip" and self._chip_retries < _CHIP_INFO_RETRIES:
+                    self._chip_info = self.get_chip_info(env)
+                    self._chip_retries += 1
+                state = (tuple(devices), mode, self._chip_info)
+                if state != self._last_state:
+                    self._last_state = state
+                    self.device_found.emit(devices, mode, self._chip_info)
+            else:
+                self._report_lost()
+
+        except Exception:
+            self._report_lost()
+
+    def _report_lost(self):
+        """Forget the device and emit device_lost unless already reported"""
+        self._last_devices = None
+        if self._last_state != ():
+            self._last_state = ()
+            self.device_lost.emit()
+
+    def get_chip_info(self, env=None):
+        try:
+            if env is None:
                 env = os.environ.copy()
                 env['NO_COLOR'] = '1'
                 env['CLICOLOR'] = '0'
                 env['CLICOLOR_FORCE'] = '0'
-                
-                result = subprocess.run([RKTOOL, "ld"], capture_output=True, text=True, timeout=3, env=env)
-                lines = result.stdout.strip().splitlines()
-                devices = [l for l in lines if "Did not find any rockusb device" not in l
-                           and "not found" not in l and l.strip()]
-
-                if devices:
-                    mode = "unknown_mode"
-                    if "MASKROM" in result.stdout.upper():
-                        mode = "Maskrom"
-                    elif "LOADER" in result.stdout.upper():
-                        mode = "Loader"
-
-                    chip_info = self.get_chip_info()
-                    self.device_found.emit(devices, mode, chip_info)
-                else:
-                    self.device_lost.emit()
-
-            except Exception:
-                self.device_lost.emit()
-
-            QThread.msleep(2000)
 
-    def get_chip_info(self):
-        try:
-            env = os.environ.copy()
-            env['NO_COLOR'] = '1'
-            env['CLICOLOR'] = '0'
-            env['CLICOLOR_FORCE'] = '0'
-            
             result = subprocess.run([RKTOOL, "rci"], capture_output=True, text=True, timeout=3, env=env)
             if result.returncode == 0:
                 raw_info = result.stdout.strip()
@@ -73,13 +174,77 @@ class DeviceWorker(QThread):
         self.running = False
 
 
+def _is_rockchip_usb(device):
+    """True if a udev USB device event is for a Rockchip device"""
+    product = device.properties.get('PRODUCT', '')
+    vendor = product.split('/', 1)[0] if product else device.properties.get('ID_VENDOR_ID', '')
+    return vendor.lower().lstrip('0') == _ROCKCHIP_VID
+
+
+# Waits before the 2nd and 3rd `ppt` attempt: the device may still be busy
+# answering another query (e.g. the poller's `ld`) when the read starts.
+_PPT_BACKOFF_MS = (100, 200)
+
+
 class PartitionPPTWorker(QThread):
-    """Background worker to run `rkdeveloptool ppt` and emit output."""
+    """Background worker to run `rkdeveloptool ppt` and emit output.
+
+    A failed read is retried with exponential backoff (3 attempts in all)
+    before the last result is reported.
+    """
     finished = Signal(str, int)
 
     def __init__(self):
         super().__init__()
 
+    def run(self):
+        # Disable color output
+        env = os.environ.copy()
+        env['NO_COLOR'] = '1'
+        env['CLICOLOR'] = '0'
+        env['CLICOLOR_FORCE'] = '0'
+
+        out, code = "", 1
+        for delay in (0, *_PPT_BACKOFF_MS):
+            if delay:
+                QThread.msleep(delay)
+            try:
+                result = subprocess.run([RKTOOL, "ppt"], capture_output=True, timeout=10, env=env)
+                # The tool prints plain ASCII; decode once here, off the GUI thread.
+                out = (result.stdout or b"").decode('ascii', errors='replace')
+                code = result.returncode
+            except subprocess.TimeoutExpired as e:
+                # A hung device won't answer a retry any sooner
+                out, code = str(e), 1
+                break
+            except Exception as e:
+                out, code = str(e), 1
+                continue
+            if code == 0:
+                break
+        # Clean ANSI codes from output
+        out = _ANSI_ESC_RE.sub('', out)
+        out = _ANSI_COLOR_RE.sub('', out)
+        out = _ANSI_CURSOR_RE.sub('', out)
+        self.finished.emit(out, code)
+
+
+class FlashInfoWorker(QThread):
+    """Background worker to run `rkdeveloptool rfi` and keep its output.
+
+    Lets callers start the query early (e.g. while a file dialog is open) and
+    collect the result later with wait() instead of blocking on the device.
+    The output is read as it streams in; with stop_at_capacity the tool is
+    terminated as soon as the sector count line arrives, which is all the
+    capacity lookups need (rfi is read-only, so cutting it short is safe).
+    """
+
+    def __init__(self, stop_at_capacity=False):
+        super().__init__()
+        self.stop_at_capacity = stop_at_capacity
+        self.output = ""
+        self.error = None
+
     def run(self):
         try:
             # Disable color output
@@ -87,35 +252,136 @@ class PartitionPPTWorker(QThread):
             env['NO_COLOR'] = '1'
             env['CLICOLOR'] = '0'
             env['CLICOLOR_FORCE'] = '0'
-            
-            result = subprocess.run([RKTOOL, "ppt"], capture_output=True, text=True, timeout=10, env=env)
-            out = result.stdout or ""
-            # Clean ANSI codes from output
-            out = re.sub(r'\x1b\[[0-9;]*[A-Za-z]', '', out)  # Binary ESC sequences
-            out = re.sub(r'\[[0-9;]*m', '', out)  # Text-form color codes
-            out = re.sub(r'\[[0-9]+[A-K]', '', out)  # Text-form cursor/clear codes
-            code = result.returncode
-            self.finished.emit(out, code)
+
+            proc = subprocess.Popen(
+                [RKTOOL, "rfi"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                text=True, encoding='ascii', errors='replace', bufsize=1, env=env
+            )
+            # Same 6 s budget as before; killing the tool ends the read loop
+            expired = threading.Event()
+
+            def expire():
+                expired.set()
+                proc.kill()
+
+            timer = threading.Timer(6, expire)
+            timer.start()
+            lines = []
+            try:
+                for line in proc.stdout:
+                    lines.append(line)
+                    if self.stop_at_capacity and _RFI_SECTORS_RE.search(line):
+                        proc.terminate()
+                        break
+                proc.stdout.close()
+                proc.wait()
+            finally:
+                timer.cancel()
+            if expired.is_set():
+                self.error = "device_timeout"
+                return
+            self.output = "".join(lines)
+        except Exception as e:
+            self.error = f"query_error: {str(e)}"
+
+
+class StorageProbeWorker(QThread):
+    """Background worker to try `rkdeveloptool cs <code>` for each storage code.
+
+    Unless the device capability is already known, `rcb` is read first: a
+    loader that can't switch storage makes every probe pointless, so none
+    are run. The probes run one after another: every one claims the same
+    USB device and switches its active storage, so they can't safely overlap.
+    """
+    finished = Signal(list)  # [(code, returncode, output, error), ...]
+
+    def __init__(self, codes, capability=None):
+        super().__init__()
+        self.codes = list(codes)
+        self.capability = capability
+
+    def run(self):
+        # Disable color output
+        env = os.environ.copy()
+        env['NO_COLOR'] = '1'
+        env['CLICOLOR'] = '0'
+        env['CLICOLOR_FORCE'] = '0'
+
+        if self.capability is None:
+            try:
+                result = subprocess.run([RKTOOL, "rcb"], capture_output=True, text=True, timeout=3, env=env)
+                if result.returncode == 0:
+                    self.capability = parse_capability(result.stdout or "")
+            except Exception:
+                pass
+        if self.capability and self.capability.get('switch_storage') is False:
+            self.finished.emit([])
+            return
+
+        results = []
+        for code in self.codes:
+            try:
+                result = subprocess.run([RKTOOL, "cs", code], capture_output=True, text=True, timeout=3, env=env)
+                output = (result.stdout or "") + (result.stderr or "")
+                results.append((code, result.returncode, output, None))
+            except Exception as e:
+                results.append((code, None, "", str(e)))
+        self.finished.emit(results)
+
+
+class DigestWorker(QThread):
+    """Background worker to hash a file so dialogs can show it when ready.
+
+    md5_only: always use MD5 (for comparing with published checksums)
+    instead of the fastest available algorithm.
+    """
+    done = Signal(str, str)  # algorithm, hex digest
+
+    def __init__(self, file_path, md5_only=False):
+        super().__init__()
+        self.file_path = file_path
+        self.md5_only = md5_only
+        self.result = None  # (algorithm, hex digest) once done was emitted
+
+    def run(self):
+        try:
+            if self.md5_only:
+                algo, digest = "MD5", calculate_file_md5(self.file_path)
+            else:
+                algo, digest = calculate_file_digest(self.file_path)
         except Exception as e:
-            self.finished.emit(str(e), 1)
+            algo, digest = "MD5", f"error: {e}"
+        self.result = (algo, digest)
+        self.done.emit(algo, digest)
 
 
 class CommandWorker(QThread):
     """Command execution worker thread with real-time stdout streaming"""
     progress = Signal(int)
-    log = Signal(str)
+    log = Signal(list)  # batch of log lines, see _log()
     finished_signal = Signal(bool, str)
 
     def __init__(self, cmd, description_key, manager):
         super().__init__()
-        self.cmd = cmd
-        self.description_key = description_key
         self.manager = manager
+        self.prepare(cmd, description_key)
         self._process = None
         self.last_logged_progress = -1
         self.last_logged_line = ""
         self.output = ""  # Store command output for callbacks
         self.chunk_buffer = ""  # Buffer for small chunks to reduce signal overhead
+        self._log_lines = []
+        self._last_log_flush = 0.0
+
+    def prepare(self, cmd, description_key):
+        """Set the command for the next start().
+
+        A finished worker can be started again, so the window keeps one
+        CommandWorker (signals connected once) and re-arms it per command.
+        """
+        self.cmd = cmd
+        self.description_key = description_key
+        self._process = None
 
     def tr(self, key):
         return self.manager.tr(key)
@@ -124,8 +390,9 @@ class CommandWorker(QThread):
         """Run command with real-time stdout streaming"""
         try:
             description = self.tr(self.description_key)
-            self.log.emit(f"[START] {self.tr('start_executing')}{description}")
-            self.log.emit(f"[COMMAND] {self.tr('command')}{' '.join(self.cmd)}")
+            self._log(f"[START] {self.tr('start_executing')}{description}")
+            self._log(f"[COMMAND] {self.tr('command')}{' '.join(self.cmd)}")
+            self._flush_log()
 
             # Disable color output from rkdeveloptool and set unbuffered mode
             env = os.environ.copy()
@@ -149,37 +416,57 @@ class CommandWorker(QThread):
                 returncode = self._run_with_pipe(env)
 
             if returncode == 0:
-                self.log.emit(f"[OK] {description} {self.tr('success')}")
+                self._log(f"[OK] {description} {self.tr('success')}")
+                self._flush_log()
                 # Only emit 100% if we haven't already reached it
                 if self.last_logged_progress < 100:
                     self.progress.emit(100)
                 self.finished_signal.emit(True, "")
             else:
                 error_msg = f"{self.tr('failure')}{returncode}"
-                self.log.emit(f"[ERROR] {description} {error_msg}")
+                self._log(f"[ERROR] {description} {error_msg}")
+                self._flush_log()
                 self.progress.emit(0)
                 self.finished_signal.emit(False, error_msg)
         except Exception as e:
             error_msg = str(e)
             description = self.tr(self.description_key) if 'description' in locals() else "command"
-            self.log.emit(f"[ERROR] {description} {self.tr('abnormal_execution')}{error_msg}")
+            self._log(f"[ERROR] {description} {self.tr('abnormal_execution')}{error_msg}")
+            self._flush_log()
             self.progress.emit(0)
             self.finished_signal.emit(False, error_msg)
 
+    def _log(self, line):
+        """Queue a log line; the batch goes out after _LOG_BATCH_SECONDS or
+        _LOG_BATCH_LINES lines, whichever comes first.
+
+        Progress output can run to thousands of lines, and one queued signal
+        per line floods the GUI event loop, so lines are handed over in lists.
+        """
+        self._log_lines.append(line)
+        if (len(self._log_lines) >= _LOG_BATCH_LINES
+                or time.monotonic() - self._last_log_flush >= _LOG_BATCH_SECONDS):
+            self._flush_log()
+
+    def _flush_log(self):
+        """Emit the queued log lines now"""
+        if self._log_lines:
+            self.log.emit(self._log_lines)
+            self._log_lines = []
+        self._last_log_flush = time.monotonic()
+
     def _consume(self, text, line_buffer):
         """Feed raw output text, flushing a line on each newline/carriage return."""
-        for ch in text:
-            self.output += ch
-            if ch == '\n' or ch == '\r':
-                self._process_line(line_buffer)
-                line_buffer = ""
-            else:
-                line_buffer += ch
-        return line_buffer
+        self.output += text
+        lines = _LINE_BREAK_RE.split(line_buffer + text)
+        for line in lines[:-1]:
+            self._process_line(line)
+        return lines[-1]
 
     def _run_with_pty(self, env):
         """Run the command attached to a pseudo-terminal for live output."""
         import pty
+        import select
         master_fd, slave_fd = pty.openpty()
         process = subprocess.Popen(
             self.cmd,
@@ -192,19 +479,26 @@ class CommandWorker(QThread):
         self._process = process
         os.close(slave_fd)  # parent only reads from the master end
 
+        # A multi-byte character can straddle two reads
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
         line_buffer = ""
         try:
             while True:
+                # Don't let queued lines wait on a quiet tool
+                if self._log_lines and not select.select([master_fd], [], [], _LOG_BATCH_SECONDS)[0]:
+                    self._flush_log()
+                    continue
                 try:
-                    data = os.read(master_fd, 4096)
+                    data = os.read(master_fd, io.DEFAULT_BUFFER_SIZE)
                 except OSError:
                     # Linux raises EIO on the master once the child exits.
                     break
                 if not data:
                     # macOS signals EOF with an empty read.
                     break
-                line_buffer = self._consume(data.decode('utf-8', errors='replace'), line_buffer)
+                line_buffer = self._consume(decoder.decode(data), line_buffer)
         finally:
+            line_buffer += decoder.decode(b"", final=True)
             if line_buffer:
                 self._process_line(line_buffer)
             try:
@@ -220,22 +514,44 @@ class CommandWorker(QThread):
             self.cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            bufsize=1,
-            universal_newlines=True,
+            bufsize=io.DEFAULT_BUFFER_SIZE,
             env=env,
         )
         self._process = process
 
+        # read1() returns whatever the pipe has (up to a buffer's worth)
+        # instead of one character per call; progress lines end in \r, so
+        # readline() would hold them back. A pipe can't be select()ed on
+        # Windows, so a reader thread hands the chunks over through a queue
+        # and waiting on that can time out to flush queued log lines while
+        # the tool is quiet.
+        chunks = queue.Queue()
+
+        def pump():
+            try:
+                for data in iter(lambda: process.stdout.read1(io.DEFAULT_BUFFER_SIZE), b""):
+                    chunks.put(data)
+            finally:
+                chunks.put(b"")  # EOF (or a failed read)
+
+        threading.Thread(target=pump, daemon=True).start()
+
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
         line_buffer = ""
         while True:
-            char = process.stdout.read(1)
-            if not char:
+            try:
+                data = chunks.get(timeout=_LOG_BATCH_SECONDS) if self._log_lines else chunks.get()
+            except queue.Empty:
+                self._flush_log()
+                continue
+            if not data:
+                line_buffer = self._consume(decoder.decode(b"", final=True), line_buffer)
                 if line_buffer:
                     self._process_line(line_buffer)
                 if self.chunk_buffer:
                     self._flush_chunk_buffer()
                 break
-            line_buffer = self._consume(char, line_buffer)
+            line_buffer = self._consume(decoder.decode(data), line_buffer)
 
         return process.wait()
 
@@ -255,30 +571,32 @@ class CommandWorker(QThread):
         if progress is not None:
             # Progress line - emit with deduplication
             if progress != self.last_logged_progress:
-                self.log.emit(line_cleaned)
+                self._log(line_cleaned)
                 self.progress.emit(progress)
                 self.last_logged_progress = progress
                 self.last_logged_line = line_cleaned
         else:
             # Regular log line - skip duplicates
             if line_cleaned != self.last_logged_line:
-                self.log.emit(line_cleaned)
+                self._log(line_cleaned)
                 self.last_logged_line = line_cleaned
 
     def _clean_ansi_codes(self, text):
         """Remove all ANSI control codes from text"""
         # Remove various ANSI escape sequences
-        text = re.sub(r'\x1b\[[0-9;]*[A-Za-z]', '', text)  # Binary ESC sequences
-        text = re.sub(r'\[[0-9;]*m', '', text)  # Text-form color codes [30;41m, [0m, etc.
-        text = re.sub(r'\[[0-9]+[A-K]', '', text)  # Text-form cursor/clear codes
-        text = re.sub(r'\[1A\[2K|\[2K|\[1A', '', text)  # Additional control codes
-        text = re.sub(r'\x1b\(.*?\x1b\)', '', text)  # Character set selection
-        text = re.sub(r'\x0f|\x0e', '', text)  # Shift out/in
+        text = _ANSI_ESC_RE.sub('', text)
+        text = _ANSI_COLOR_RE.sub('', text)
+        text = _ANSI_CURSOR_RE.sub('', text)
+        text = _ANSI_EXTRA_RE.sub('', text)
+        text = _CHARSET_RE.sub('', text)
+        text = _SHIFT_RE.sub('', text)
         return text
     
     def _extract_progress(self, text):
         """Extract progress percentage from text"""
-        match = re.search(r'(\d+)%', text)
+        if '%' not in text:  # most lines; a substring test beats the regex engine
+            return None
+        match = _PROGRESS_RE.search(text)
         if match:
             try:
                 progress = int(match.group(1))